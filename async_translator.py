@@ -0,0 +1,95 @@
+import asyncio
+import concurrent.futures
+import threading
+from typing import Callable, Iterable, List, Optional
+
+from google_translator import GoogleTranslator
+
+DEFAULT_CONCURRENCY = 8
+
+
+class AsyncGoogleTranslator:
+    """
+    Motor de tradução asyncio com concorrência limitada.
+
+    Cada segmento passa pelo mesmo GoogleTranslator.translate (memória de
+    tradução, sessão partilhada e limitador), executado num pool de threads
+    para manter até ``concurrency`` requisições em curso ao mesmo tempo.
+    """
+
+    def __init__(self, translator: Optional[GoogleTranslator] = None,
+                 concurrency: int = DEFAULT_CONCURRENCY):
+        self.translator = translator if translator is not None else GoogleTranslator()
+        self.concurrency = concurrency
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix='translate'
+        )
+
+    async def translate(self, text: str, source_lang: str = 'en', target_lang: str = 'pt') -> Optional[str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.translator.translate, text, source_lang, target_lang
+        )
+
+    async def translate_many(self, segments: Iterable[str], source_lang: str = 'en',
+                             target_lang: str = 'pt',
+                             progress_callback: Optional[Callable[[int, int], None]] = None
+                             ) -> List[Optional[str]]:
+        """
+        Traduz vários segmentos em paralelo, preservando a ordem.
+
+        Args:
+            segments: Segmentos para traduzir
+            source_lang: Idioma de origem (padrão: 'en')
+            target_lang: Idioma de destino (padrão: 'pt')
+            progress_callback: Chamada com (concluídos, total) após cada segmento
+
+        Returns:
+            Lista com a tradução de cada segmento (None nos que falharem)
+        """
+        segments = list(segments)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        done = 0
+
+        async def run(segment):
+            nonlocal done
+            async with semaphore:
+                translated = await self.translate(segment, source_lang, target_lang)
+            done += 1
+            if progress_callback:
+                progress_callback(done, len(segments))
+            return translated
+
+        return await asyncio.gather(*(run(segment) for segment in segments))
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class BackgroundLoop:
+    """Event loop asyncio numa thread daemon, para uso a partir de Tk ou de ciclos síncronos."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='asyncio-loop', daemon=True)
+        self._thread.start()
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+_shared_loop: Optional[BackgroundLoop] = None
+_shared_lock = threading.Lock()
+
+
+def shared_loop() -> BackgroundLoop:
+    """Devolve o event loop de fundo partilhado pelo processo."""
+    global _shared_loop
+    with _shared_lock:
+        if _shared_loop is None:
+            _shared_loop = BackgroundLoop()
+        return _shared_loop
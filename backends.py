@@ -0,0 +1,290 @@
+import importlib.util
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import metrics
+from google_translator import GoogleTranslator
+from rate_limiter import AdaptiveRateLimiter
+from resilience import CircuitBreaker, RetryPolicy
+
+# Com o router, poucas tentativas por motor: falhar depressa e passar ao seguinte
+ROUTED_RETRY_ATTEMPTS = 2
+
+BACKEND_REQUESTS = metrics.METRICS.counter('translator_backend_requests_total',
+                                           "Textos traduzidos por motor e resultado")
+FAILOVERS = metrics.METRICS.counter('translator_backend_failovers_total',
+                                    "Textos repetidos noutro motor depois de uma falha")
+
+
+class TranslationBackend:
+    """
+    Interface comum dos motores de tradução.
+
+    ``translate`` tem a assinatura de GoogleTranslator.translate_with_progress
+    e lança uma exceção quando falha, para o BackendRouter poder passar ao
+    motor seguinte.
+    """
+
+    name = 'base'
+
+    def available(self) -> bool:
+        """False quando o motor não pode ser usado (por exemplo, dependência em falta)."""
+        return True
+
+    def healthy(self) -> bool:
+        """False enquanto o motor pede para não receber tráfego (por exemplo, disjuntor aberto)."""
+        return True
+
+    def translate(self, text: str, progress_callback=None, source_lang: str = 'en',
+                  target_lang: str = 'pt', checkpoint=None) -> str:
+        raise NotImplementedError
+
+    def translate_targets(self, text: str, target_langs: Sequence[str], progress_callback=None,
+                          source_lang: str = 'en') -> Dict[str, str]:
+        """Traduz para vários idiomas; por omissão, um idioma de cada vez."""
+        results = {}
+        for n, lang in enumerate(target_langs):
+            def lang_progress(progress, n=n):
+                if progress_callback:
+                    progress_callback((n + progress / 100) / len(target_langs) * 100)
+
+            results[lang] = self.translate(text, lang_progress, source_lang, lang)
+        return results
+
+
+class GtxBackend(TranslationBackend):
+    """Endpoint translate_a/single?client=gtx através do GoogleTranslator."""
+
+    name = 'gtx'
+
+    def __init__(self, translator: Optional[GoogleTranslator] = None):
+        self.translator = translator if translator is not None else GoogleTranslator()
+
+    def healthy(self) -> bool:
+        # O estado só passa de aberto a semiaberto dentro de wait(): conta o tempo
+        return self.translator.breaker.accepting()
+
+    def translate(self, text, progress_callback=None, source_lang='en', target_lang='pt', checkpoint=None):
+        return self.translator.translate_with_progress(text, progress_callback, source_lang, target_lang,
+                                                       checkpoint=checkpoint)
+
+    def translate_targets(self, text, target_langs, progress_callback=None, source_lang='en'):
+        return self.translator.translate_targets(text, target_langs, progress_callback, source_lang)
+
+
+class GoogletransTranslator(GoogleTranslator):
+    """
+    GoogleTranslator que faz cada requisição através da biblioteca googletrans.
+
+    Reaproveita a segmentação, os pacotes, a memória de tradução e os
+    checkpoints do GoogleTranslator; só o _fetch muda. O googletrans é
+    importado apenas quando a primeira requisição é feita.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('limiter', AdaptiveRateLimiter())
+        kwargs.setdefault('breaker', CircuitBreaker())
+        super().__init__(**kwargs)
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            from googletrans import Translator
+            client = self._local.client = Translator()
+        return client
+
+    def _fetch(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        import inspect
+
+        from async_translator import shared_loop
+
+        # Como no GoogleTranslator: espera o fim da pausa e deixa passar o pedido de teste
+        self.breaker.wait()
+        self.limiter.acquire()
+        started = time.perf_counter()
+        try:
+            result = self._client().translate(text, src=source_lang, dest=target_lang)
+            # As versões 4.x do googletrans devolvem uma corrotina; as ligações do
+            # cliente ficam presas ao loop em que correm, por isso é sempre o mesmo
+            if inspect.isawaitable(result):
+                result = shared_loop().submit(result).result()
+        except Exception:
+            metrics.REQUESTS.inc(status='googletrans-erro')
+            self.breaker.record_failure()
+            raise
+        finally:
+            metrics.REQUEST_LATENCY.observe(time.perf_counter() - started)
+        metrics.REQUESTS.inc(status='googletrans')
+        self.breaker.record_success()
+        self.limiter.record_success()
+        return result.text
+
+
+class GoogletransBackend(GtxBackend):
+    """Biblioteca googletrans (opcional)."""
+
+    name = 'googletrans'
+
+    def __init__(self, translator: Optional[GoogletransTranslator] = None):
+        super().__init__(translator if translator is not None else GoogletransTranslator())
+
+    def available(self) -> bool:
+        return importlib.util.find_spec('googletrans') is not None
+
+
+class BackendHealth:
+    """Latência e taxa de erro recentes de um motor (médias móveis exponenciais)."""
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        # Segundos por 1000 caracteres, para comparar textos de tamanhos diferentes
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+
+    def record(self, ok: bool, elapsed: float, chars: int):
+        self.last_used = time.monotonic()
+        self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+        if ok:
+            self.consecutive_failures = 0
+            cost = elapsed / max(chars, 1) * 1000
+            self.latency = cost if self.latency is None else self.latency + self.alpha * (cost - self.latency)
+        else:
+            self.consecutive_failures += 1
+
+    def score(self) -> float:
+        return (self.latency or 0.0) * (1 + 4 * self.error_rate)
+
+    def describe(self) -> dict:
+        return {
+            'latency_s_per_kchar': round(self.latency, 4) if self.latency is not None else None,
+            'error_rate': round(self.error_rate, 3),
+            'cooling_down': self.cooldown_until > time.monotonic(),
+        }
+
+
+class BackendRouter:
+    """
+    Encaminha cada texto para o motor mais saudável e passa ao seguinte se falhar.
+
+    Os motores são ordenados pela latência recente (por 1000 caracteres)
+    penalizada pela taxa de erro; os que ainda não foram medidos mantêm a
+    ordem da lista, pelo que o primeiro é o motor preferido. Depois de
+    ``failure_threshold`` falhas seguidas um motor fica ``cooldown`` segundos
+    fora da rotação. A cada ``probe_every`` textos o motor usado há mais
+    tempo recebe um texto, para que a sua latência se mantenha atualizada.
+
+    ``translate`` tem a assinatura de translate_with_progress e pode ser
+    passado diretamente ao BatchTranslator.
+    """
+
+    def __init__(self, backends: Sequence[TranslationBackend], alpha: float = 0.3,
+                 failure_threshold: int = 3, cooldown: float = 30.0, probe_every: int = 20):
+        self.backends = [backend for backend in backends if backend.available()]
+        if not self.backends:
+            raise ValueError("nenhum motor de tradução disponível")
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.probe_every = probe_every
+        self.health = {backend.name: BackendHealth(alpha) for backend in self.backends}
+        self._calls = 0
+        self._lock = threading.Lock()
+
+    def _rank(self, backend: TranslationBackend) -> float:
+        health = self.health[backend.name]
+        if health.latency is not None:
+            return health.score()
+        # Sem medições, o primeiro motor da lista vai à frente e os outros atrás dos medidos
+        return 0.0 if backend is self.backends[0] and not health.error_rate else float('inf')
+
+    def _order(self) -> List[TranslationBackend]:
+        now = time.monotonic()
+        with self._lock:
+            self._calls += 1
+            ready = [b for b in self.backends if self.health[b.name].cooldown_until <= now and b.healthy()]
+            resting = [b for b in self.backends if b not in ready]
+            order = sorted(ready, key=self._rank)
+            if self.probe_every and self._calls % self.probe_every == 0 and len(order) > 1:
+                probe = min(order, key=lambda b: self.health[b.name].last_used)
+                order.remove(probe)
+                order.insert(0, probe)
+        # Os motores em pausa ficam como último recurso
+        return order + resting
+
+    def _record(self, backend: TranslationBackend, ok: bool, elapsed: float, chars: int):
+        with self._lock:
+            health = self.health[backend.name]
+            health.record(ok, elapsed, chars)
+            if not ok and health.consecutive_failures >= self.failure_threshold:
+                health.cooldown_until = time.monotonic() + self.cooldown
+                health.consecutive_failures = 0
+        BACKEND_REQUESTS.inc(backend=backend.name, status='ok' if ok else 'erro')
+
+    def _route(self, text: str, call: Callable[[TranslationBackend], object]):
+        last_error = None
+        for attempt, backend in enumerate(self._order()):
+            if attempt:
+                FAILOVERS.inc()
+            started = time.monotonic()
+            try:
+                result = call(backend)
+            except Exception as e:
+                self._record(backend, False, time.monotonic() - started, len(text))
+                last_error = e
+                continue
+            self._record(backend, True, time.monotonic() - started, len(text))
+            return result
+        raise last_error
+
+    def translate(self, text: str, progress_callback: Optional[Callable[[float], None]] = None,
+                  source_lang: str = 'en', target_lang: str = 'pt', checkpoint=None) -> str:
+        """
+        Traduz o texto com o melhor motor disponível.
+
+        Raises:
+            Exception: a última exceção, se todos os motores falharem
+        """
+        if not text.strip():
+            return ""
+        return self._route(text, lambda backend: backend.translate(text, progress_callback, source_lang,
+                                                                   target_lang, checkpoint=checkpoint))
+
+    def translate_targets(self, text: str, target_langs: Sequence[str],
+                          progress_callback: Optional[Callable[[float], None]] = None,
+                          source_lang: str = 'en') -> Dict[str, str]:
+        """Como translate, mas para vários idiomas de uma vez (ver GoogleTranslator.translate_targets)."""
+        if not text.strip():
+            return {lang: "" for lang in target_langs}
+        return self._route(text, lambda backend: backend.translate_targets(text, target_langs, progress_callback,
+                                                                           source_lang))
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {name: health.describe() for name, health in self.health.items()}
+
+
+def build_router(preferred: str = 'gtx', translator: Optional[GoogleTranslator] = None) -> BackendRouter:
+    """
+    Cria um router com o motor ``preferred`` à frente e os restantes como alternativa.
+
+    Quando há mais de um motor disponível, cada um repete no máximo
+    ROUTED_RETRY_ATTEMPTS vezes antes de o texto passar ao seguinte.
+
+    Args:
+        preferred: 'gtx' ou 'googletrans'
+        translator: GoogleTranslator a usar no motor gtx (memória, sessão e
+            limitador próprios); a memória de tradução e o pré-filtro são
+            partilhados com o googletrans
+    """
+    gtx = GtxBackend(translator)
+    googletrans = GoogletransBackend(GoogletransTranslator(memory=gtx.translator.memory))
+    googletrans.translator.prefilter = gtx.translator.prefilter
+    router = BackendRouter([googletrans, gtx] if preferred == 'googletrans' else [gtx, googletrans])
+    if len(router.backends) > 1:
+        for backend in router.backends:
+            backend.translator.retry = RetryPolicy(max_attempts=ROUTED_RETRY_ATTEMPTS)
+    return router
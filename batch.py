@@ -0,0 +1,388 @@
+import concurrent.futures
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import metrics
+from dedup import repeated_segments
+from journal import BatchJournal, file_fingerprint
+from manifest import TranslationManifest, hash_text, split_blocks
+from segmenter import DEFAULT_MAX_ENCODED
+from streaming import translate_file_streaming, translate_file_streaming_targets
+
+DEFAULT_WORKERS = 4
+
+STATUS_OK = 'ok'
+STATUS_EMPTY = 'vazio'
+STATUS_ERROR = 'erro'
+STATUS_SKIPPED = 'ignorado'
+
+# Nome reportado no progresso durante a tradução dos segmentos repetidos
+DEDUP_STAGE_NAME = 'segmentos repetidos'
+
+
+def write_atomic(path: str, text: str):
+    """Escreve num ficheiro temporário e substitui o destino, para nunca deixar saídas cortadas."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.part"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp_path, path)
+
+
+def target_output_path(output_path: str, lang: str) -> str:
+    """Saída de um idioma no modo multi-idioma: 'pasta/nome.txt' -> 'pasta/nome.<lang>.txt'."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.{lang}{ext}"
+
+
+class FileResult:
+    """Resultado da tradução de um ficheiro num lote."""
+
+    def __init__(self, name: str, input_path: str, output_path: str,
+                 fingerprint: Optional[Tuple[int, int]] = None):
+        self.name = name
+        self.input_path = input_path
+        self.output_path = output_path
+        # (tamanho, mtime_ns) já obtidos na listagem, para não repetir o stat
+        self.fingerprint = fingerprint
+        self.status = STATUS_ERROR
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status in (STATUS_OK, STATUS_SKIPPED)
+
+    def __repr__(self):
+        return f"FileResult({self.name!r}, {self.status!r})"
+
+
+class BatchTranslator:
+    """
+    Traduz vários ficheiros em simultâneo num pool de workers.
+
+    ``translate_text(texto, progress_callback)`` é chamada em cada worker e
+    deve devolver o texto traduzido ou lançar uma exceção. Todos os workers
+    partilham o mesmo GoogleTranslator e, portanto, o mesmo limitador de taxa.
+    O callback de progresso de run() é sempre chamado na thread que chamou
+    run(), pelo que pode atualizar widgets Tk diretamente.
+
+    Com um ``journal`` os ficheiros já concluídos são ignorados e
+    ``translate_text`` recebe também ``checkpoint=`` (um FileCheckpoint) para
+    retomar a partir do último segmento registado.
+
+    Com um ``manifest`` os ficheiros inalterados desde a última execução são
+    ignorados sem serem lidos e, nos alterados, só os parágrafos novos são
+    enviados para tradução.
+
+    Ficheiros maiores que ``stream_above`` bytes são traduzidos em streaming
+    (streaming.py), com memória constante; ``translate_text`` tem então de
+    preservar as linhas. Com um ``journal`` cada janela escrita é registada e
+    um ficheiro interrompido continua a partir da última janela.
+
+    Com ``dedup`` o lote começa por recolher os segmentos que se repetem entre
+    os ficheiros a traduzir e traduz cada um uma só vez; os ficheiros
+    encontram-nos depois na memória de tradução. ``translate_text`` tem de
+    usar a memória de tradução (por exemplo translate_with_progress). Os
+    ``jobs`` são então percorridos até ao fim antes do primeiro ficheiro, por
+    isso a listagem preguiçosa deixa de adiantar a primeira tradução.
+
+    Com ``targets`` (lista de idiomas) cada ficheiro é lido e segmentado uma
+    só vez e traduzido para todos os idiomas, escrevendo ``nome.<idioma>.txt``
+    ao lado (target_output_path). ``translate_text(texto, progresso,
+    targets=[...])`` deve então devolver um dicionário idioma -> tradução
+    (por exemplo GoogleTranslator.translate_targets). O diário e o manifesto
+    registam cada idioma em separado; não há retoma a meio de um ficheiro nem
+    reaproveitamento por parágrafo.
+    """
+
+    def __init__(self, translate_text: Callable[..., Optional[str]],
+                 workers: int = DEFAULT_WORKERS, journal: Optional[BatchJournal] = None,
+                 manifest: Optional[TranslationManifest] = None,
+                 stream_above: Optional[int] = None, dedup: bool = False,
+                 targets: Optional[Sequence[str]] = None):
+        self.translate_text = translate_text
+        self.workers = workers
+        self.journal = journal
+        self.manifest = manifest
+        self.stream_above = stream_above
+        self.dedup = dedup
+        self.targets = list(targets) if targets else None
+
+    def _translate_changed_blocks(self, content: str, reusable: dict, file_progress):
+        """Traduz só os parágrafos cujo hash não aparece na saída anterior."""
+        blocks = split_blocks(content)
+        hashes = [hash_text(block) for block in blocks]
+        changed = [i for i, block in enumerate(blocks) if block.strip() and hashes[i] not in reusable]
+
+        translated_lines = {}
+        for done, i in enumerate(changed):
+            def block_progress(progress, done=done):
+                file_progress((done + progress / 100) / len(changed) * 100)
+
+            translated = self.translate_text(blocks[i], block_progress)
+            if translated is None:
+                raise ValueError("tradução vazia")
+            translated_lines[i] = translated.split('\n')
+
+        output_lines = []
+        block_meta = []
+        for i, block in enumerate(blocks):
+            lines = translated_lines.get(i) or reusable.get(hashes[i]) or ['']
+            output_lines.extend(lines)
+            block_meta.append((hashes[i], len(lines)))
+        return '\n'.join(output_lines), block_meta
+
+    @staticmethod
+    def _block_meta(content: str, translated_text: str):
+        # A saída só pode ser dividida por parágrafos se preservar as linhas da origem
+        if translated_text.count('\n') != content.count('\n'):
+            return None
+        return [(hash_text(block), block.count('\n') + 1) for block in split_blocks(content)]
+
+    def _finish_file(self, result: FileResult, fingerprint, block_meta):
+        if self.journal:
+            self.journal.mark_done(result.name, fingerprint)
+        if self.manifest:
+            self.manifest.update(result.name, result.input_path, result.output_path, block_meta)
+        result.status = STATUS_OK
+
+    def _translate_text(self, text: str, progress):
+        if self.targets:
+            return self.translate_text(text, progress, targets=self.targets)
+        return self.translate_text(text, progress)
+
+    def _pending_targets(self, result: FileResult, fingerprint) -> Dict[str, str]:
+        """Idiomas (-> caminho de saída) que ainda faltam traduzir neste ficheiro."""
+        pending = {}
+        for lang in self.targets:
+            name = f"{result.name}.{lang}"
+            output_path = target_output_path(result.output_path, lang)
+            if self.manifest and self.manifest.check(name, result.input_path, output_path, fingerprint)[0]:
+                continue
+            if self.journal and self.journal.is_done(name, fingerprint):
+                continue
+            pending[lang] = output_path
+        return pending
+
+    def _translate_targets_one(self, result: FileResult, fingerprint, file_progress):
+        pending = self._pending_targets(result, fingerprint)
+        if not pending:
+            result.status = STATUS_SKIPPED
+            return
+
+        def translate_targets(text, progress):
+            return self.translate_text(text, progress, targets=list(pending))
+
+        if self.stream_above is not None and fingerprint[0] > self.stream_above:
+            translate_file_streaming_targets(translate_targets, result.input_path, pending, file_progress)
+            translations = None
+        else:
+            with open(result.input_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            translations = translate_targets(content, file_progress)
+            if not all(translations.get(lang) for lang in pending):
+                result.status = STATUS_EMPTY
+                return
+
+        for lang, output_path in pending.items():
+            block_meta = None
+            if translations is not None:
+                write_atomic(output_path, translations[lang])
+                block_meta = self._block_meta(content, translations[lang])
+            name = f"{result.name}.{lang}"
+            if self.journal:
+                self.journal.mark_done(name, fingerprint)
+            if self.manifest:
+                self.manifest.update(name, result.input_path, output_path, block_meta)
+        result.status = STATUS_OK
+
+    def _needs_translation(self, result: FileResult) -> bool:
+        """True se o ficheiro vai ser traduzido por inteiro (não é ignorado, retomado nem em streaming)."""
+        fingerprint = result.fingerprint or file_fingerprint(result.input_path)
+        if self.stream_above is not None and fingerprint[0] > self.stream_above:
+            return False
+        if self.targets:
+            return bool(self._pending_targets(result, fingerprint))
+        if self.journal and (self.journal.is_done(result.name, fingerprint)
+                             or self.journal.checkpoint(result.name, fingerprint).segments):
+            return False
+        if self.manifest:
+            unchanged, previous = self.manifest.check(result.name, result.input_path, result.output_path,
+                                                      fingerprint)
+            if unchanged or self.manifest.previous_blocks(previous):
+                return False
+        return True
+
+    def _translate_repeated(self, results: List[FileResult], progress_callback: Optional[Callable]):
+        """Traduz uma vez cada segmento repetido entre os ficheiros, antes do lote."""
+        paths = []
+        for result in results:
+            try:
+                if self._needs_translation(result):
+                    paths.append(result.input_path)
+            except OSError:
+                # O erro é reportado quando o ficheiro for traduzido
+                continue
+        segments = repeated_segments(paths)
+        if not segments:
+            return
+
+        # Os segmentos não têm quebras de linha: juntos por '\n' voltam a ser os mesmos segmentos
+        # Blocos de pelo menos um pacote cada, para não partir pacotes entre workers
+        chunk_count = max(1, min(self.workers * 4, sum(map(len, segments)) // DEFAULT_MAX_ENCODED))
+        chunk_size = -(-len(segments) // chunk_count)
+        chunks = ['\n'.join(segments[i:i + chunk_size]) for i in range(0, len(segments), chunk_size)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers,
+                                                   thread_name_prefix='dedup') as executor:
+            futures = [executor.submit(self._translate_text, chunk, None) for chunk in chunks]
+            for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception:
+                    # Os segmentos que faltarem são pedidos com o respetivo ficheiro
+                    pass
+                if progress_callback:
+                    progress_callback(DEDUP_STAGE_NAME, done / len(chunks) * 100, 0.0, 0, len(results))
+
+    def _translate_one(self, result: FileResult, events: queue.Queue):
+        started = time.monotonic()
+        try:
+            fingerprint = result.fingerprint or file_fingerprint(result.input_path)
+
+            def file_progress(progress):
+                events.put(('progress', result, progress))
+
+            if self.targets:
+                self._translate_targets_one(result, fingerprint, file_progress)
+                return
+
+            previous = None
+            if self.manifest:
+                unchanged, previous = self.manifest.check(result.name, result.input_path, result.output_path,
+                                                          fingerprint)
+                if unchanged:
+                    result.status = STATUS_SKIPPED
+                    return
+
+            if self.journal and self.journal.is_done(result.name, fingerprint):
+                result.status = STATUS_SKIPPED
+                return
+
+            if self.stream_above is not None and fingerprint[0] > self.stream_above:
+                checkpoint = self.journal.stream_checkpoint(result.name, fingerprint) if self.journal else None
+                translate_file_streaming(self.translate_text, result.input_path, result.output_path,
+                                         file_progress, checkpoint=checkpoint)
+                self._finish_file(result, fingerprint, None)
+                return
+
+            with open(result.input_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+            reusable = self.manifest.previous_blocks(previous) if self.manifest else {}
+            block_meta = None
+            if reusable:
+                translated_text, block_meta = self._translate_changed_blocks(content, reusable, file_progress)
+            elif self.journal:
+                checkpoint = self.journal.checkpoint(result.name, fingerprint)
+                translated_text = self.translate_text(content, file_progress, checkpoint=checkpoint)
+            else:
+                translated_text = self.translate_text(content, file_progress)
+
+            if translated_text:
+                write_atomic(result.output_path, translated_text)
+                if block_meta is None:
+                    block_meta = self._block_meta(content, translated_text)
+                self._finish_file(result, fingerprint, block_meta)
+            else:
+                result.status = STATUS_EMPTY
+        except Exception as e:
+            result.status = STATUS_ERROR
+            result.error = str(e)
+        finally:
+            result.elapsed = time.monotonic() - started
+            metrics.FILE_SECONDS.observe(result.elapsed)
+            metrics.FILES.inc(status=result.status)
+            events.put(('done', result, 100.0))
+
+    def run(self, jobs: Iterable[Tuple[str, str, str]],
+            progress_callback: Optional[Callable] = None) -> List[FileResult]:
+        """
+        Executa o lote.
+
+        Args:
+            jobs: Tuplos (nome, caminho de entrada, caminho de saída) ou
+                (nome, entrada, saída, fingerprint), por exemplo de
+                file_scanner.scan_jobs. Pode ser um iterador preguiçoso: os
+                ficheiros começam a ser traduzidos enquanto ainda está a ser
+                percorrido, e o total de ficheiros reportado cresce com ele
+            progress_callback: Chamada como (nome, progresso do ficheiro,
+                progresso total, ficheiros concluídos, total de ficheiros); com
+                ``dedup`` o nome é DEDUP_STAGE_NAME enquanto os segmentos
+                repetidos são traduzidos
+
+        Returns:
+            Um FileResult por ficheiro, pela ordem de ``jobs``
+        """
+        results = []
+        if self.dedup:
+            # A deduplicação precisa de todos os ficheiros antes de começar
+            results = [FileResult(*job) for job in jobs]
+            self._translate_repeated(results, progress_callback)
+            jobs = iter(results)
+
+        file_progress = {}
+        queued = 0
+        finished = 0
+        scanning = True
+        scan_error = None
+        events = queue.Queue()
+
+        def feed(executor):
+            # Submete os ficheiros à medida que o iterador os produz (por exemplo,
+            # durante a listagem de uma pasta), para a tradução começar logo
+            try:
+                for job in jobs:
+                    result = job if isinstance(job, FileResult) else FileResult(*job)
+                    if not self.dedup:
+                        results.append(result)
+                    events.put(('queued', result, 0.0))
+                    executor.submit(self._translate_one, result, events)
+            except Exception as e:
+                events.put(('scanned', e, 0.0))
+            else:
+                events.put(('scanned', None, 0.0))
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers,
+                                                       thread_name_prefix='batch') as executor:
+                feeder = threading.Thread(target=feed, args=(executor,), name='batch-feed', daemon=True)
+                feeder.start()
+
+                while scanning or finished < queued:
+                    kind, result, progress = events.get()
+                    if kind == 'scanned':
+                        scanning = False
+                        scan_error = result
+                        continue
+                    if kind == 'queued':
+                        queued += 1
+                        file_progress[id(result)] = 0.0
+                        continue
+                    file_progress[id(result)] = progress
+                    if kind == 'done':
+                        finished += 1
+                    if progress_callback:
+                        total_progress = sum(file_progress.values()) / queued
+                        progress_callback(result.name, progress, total_progress, finished, queued)
+                feeder.join()
+        finally:
+            if self.manifest:
+                self.manifest.save()
+
+        if scan_error is not None:
+            raise scan_error
+        return results
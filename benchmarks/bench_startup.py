@@ -0,0 +1,194 @@
+"""
+Benchmark do arranque: importação dos módulos, primeira janela e primeira tradução.
+
+Cada medição corre num processo novo (arranque a frio do interpretador) e é
+repetida ``--repeat`` vezes, ficando a melhor. Além dos tempos, regista que
+módulos pesados (requests, sqlite3, googletrans, asyncio) já estão carregados
+nesse ponto; com ``--check`` o código de saída é 1 se algum aparecer antes
+de ser preciso ou se um orçamento for ultrapassado.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --check --budget window:tanslator-4.py=400
+    python benchmarks/bench_startup.py --json arranque.json
+    python benchmarks/bench_startup.py --baseline arranque.json --tolerance 0.3
+
+As medições de janela precisam de um ecrã (DISPLAY); sem ele são ignoradas.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_server import MockTranslateServer  # noqa: E402
+
+HEAVY_MODULES = ('requests', 'sqlite3', 'googletrans', 'asyncio')
+IMPORT_TARGETS = ('google_translator', 'batch', 'backends', 'translate_cli', 'tk_jobs')
+WINDOW_TARGETS = ('tanslator.py', 'tanslator-1.py', 'tanslator-2.py', 'tanslator-3.py', 'tanslator-4.py')
+# Módulos que cada medição pode ter carregado sem ser um atraso indevido
+ALLOWED = {
+    'translation': ('requests', 'sqlite3'),
+}
+
+
+def loaded_heavy_modules():
+    return [name for name in HEAVY_MODULES if name in sys.modules]
+
+
+def child_import(target: str) -> dict:
+    started = time.perf_counter()
+    __import__(target)
+    return {'inner_ms': round((time.perf_counter() - started) * 1000, 2), 'heavy': loaded_heavy_modules()}
+
+
+def child_window(target: str) -> dict:
+    import runpy
+    import tkinter
+
+    started = time.perf_counter()
+    result = {}
+
+    def first_window(self, n=0):
+        # Desenha a janela uma vez e termina em vez de entrar no ciclo de eventos
+        self.update()
+        result.update(inner_ms=round((time.perf_counter() - started) * 1000, 2), heavy=loaded_heavy_modules())
+        raise SystemExit(0)
+
+    tkinter.Misc.mainloop = first_window
+    sys.argv = [target]
+    try:
+        runpy.run_path(os.path.join(ROOT, target), run_name='__main__')
+    except SystemExit:
+        pass
+    return result
+
+
+def child_translation(url: str) -> dict:
+    started = time.perf_counter()
+    from google_translator import GoogleTranslator
+    from translation_memory import TranslationMemory
+
+    translator = GoogleTranslator(memory=TranslationMemory(':memory:'))
+    translator.base_url = url
+    translated = translator.translate_strict("Hello world", 'en', 'pt')
+    if not translated:
+        raise RuntimeError("tradução vazia")
+    return {'inner_ms': round((time.perf_counter() - started) * 1000, 2), 'heavy': loaded_heavy_modules()}
+
+
+def run_child(kind: str, target: str, repeat: int) -> dict:
+    """Corre a medição ``repeat`` vezes em processos novos e fica com a mais rápida."""
+    best = None
+    for _ in range(repeat):
+        command = [sys.executable, os.path.abspath(__file__), '--child', kind, '--target', target]
+        started = time.perf_counter()
+        completed = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+        wall_ms = round((time.perf_counter() - started) * 1000, 2)
+        if completed.returncode != 0:
+            return {'scenario': f"{kind}:{target}", 'skipped': completed.stderr.strip().splitlines()[-1:]}
+        row = json.loads(completed.stdout.strip().splitlines()[-1])
+        if not row:
+            return {'scenario': f"{kind}:{target}", 'skipped': ["sem janela"]}
+        row.update(scenario=f"{kind}:{target}" if kind != 'translation' else kind, wall_ms=wall_ms)
+        if best is None or row['wall_ms'] < best['wall_ms']:
+            best = row
+    return best
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark do arranque das ferramentas de tradução.")
+    parser.add_argument('--repeat', type=int, default=5, help="processos por medição (fica o melhor)")
+    parser.add_argument('--no-window', action='store_true', help="não mede a abertura das janelas Tk")
+    parser.add_argument('--budget', action='append', default=[], metavar='CENÁRIO=MS',
+                        help="tempo máximo (wall) de um cenário, por exemplo import:translate_cli=150")
+    parser.add_argument('--check', action='store_true',
+                        help="falha se um módulo pesado for carregado cedo ou um orçamento for ultrapassado")
+    parser.add_argument('--json', help="guarda os resultados neste ficheiro")
+    parser.add_argument('--baseline', help="compara com resultados guardados com --json")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="aumento máximo aceite face à baseline (fração)")
+    parser.add_argument('--child', choices=('import', 'window', 'translation'), help=argparse.SUPPRESS)
+    parser.add_argument('--target', help=argparse.SUPPRESS)
+    return parser
+
+
+def check(results, budgets) -> int:
+    failures = 0
+    for row in results:
+        if 'skipped' in row:
+            continue
+        kind = row['scenario'].split(':')[0]
+        early = [name for name in row['heavy'] if name not in ALLOWED.get(kind, ())]
+        if early:
+            failures += 1
+            print(f"MÓDULOS PESADOS em {row['scenario']}: {', '.join(early)}")
+        budget = budgets.get(row['scenario'])
+        if budget is not None and row['wall_ms'] > budget:
+            failures += 1
+            print(f"ORÇAMENTO {row['scenario']}: {row['wall_ms']} ms > {budget} ms")
+    return failures
+
+
+def compare(results, baseline_path, tolerance) -> int:
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {row['scenario']: row for row in json.load(f)}
+    regressions = 0
+    for row in results:
+        before = baseline.get(row['scenario'])
+        if not before or 'skipped' in row or 'skipped' in before:
+            continue
+        if row['wall_ms'] > before['wall_ms'] * (1 + tolerance):
+            regressions += 1
+            print(f"REGRESSÃO {row['scenario']}: {before['wall_ms']} -> {row['wall_ms']} ms")
+    return regressions
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.child == 'import':
+        print(json.dumps(child_import(args.target)))
+        return 0
+    if args.child == 'window':
+        print(json.dumps(child_window(args.target)))
+        return 0
+    if args.child == 'translation':
+        print(json.dumps(child_translation(args.target)))
+        return 0
+
+    budgets = {}
+    for item in args.budget:
+        scenario, _, ms = item.rpartition('=')
+        budgets[scenario] = float(ms)
+
+    results = [run_child('import', 'sys', args.repeat)]
+    results += [run_child('import', target, args.repeat) for target in IMPORT_TARGETS]
+    if not args.no_window:
+        results += [run_child('window', target, args.repeat) for target in WINDOW_TARGETS]
+    with MockTranslateServer() as server:
+        results.append(run_child('translation', server.url, args.repeat))
+
+    print(f"{'cenário':>28}  {'wall_ms':>9}  {'inner_ms':>9}  pesados")
+    for row in results:
+        if 'skipped' in row:
+            print(f"{row['scenario']:>28}  ignorado: {' '.join(row['skipped'])}")
+            continue
+        print(f"{row['scenario']:>28}  {row['wall_ms']:>9}  {row['inner_ms']:>9}  {','.join(row['heavy']) or '-'}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failures = 0
+    if args.check:
+        failures += check(results, budgets)
+    if args.baseline:
+        failures += compare(results, args.baseline, args.tolerance)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Benchmark reproduzível dos caminhos de tradução contra o servidor gtx falso.
+
+Cada cenário corre num subprocesso novo (memória de tradução vazia, RSS
+isolado) contra benchmarks/mock_server.py e reporta segmentos/s,
+caracteres/s, latência p50/p99 por requisição e pico de RSS.
+
+    python benchmarks/bench_throughput.py
+    python benchmarks/bench_throughput.py --latency 80 --docs 40 --json resultados.json
+    python benchmarks/bench_throughput.py --baseline resultados.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_server import MockTranslateServer  # noqa: E402
+
+SCENARIOS = ('translate', 'translate_with_progress', 'translate_many', 'batch')
+WORDS = (
+    "the quick brown fox jumps over lazy dog translation memory request latency network "
+    "segment sentence paragraph file folder batch worker queue server client response"
+).split()
+
+
+def build_corpus(docs: int, lines: int, seed: int):
+    """Gera documentos sintéticos determinísticos (com linhas repetidas, como num corpus real)."""
+    rng = random.Random(seed)
+    boilerplate = [" ".join(rng.choice(WORDS) for _ in range(8)).capitalize() + "." for _ in range(5)]
+    corpus = []
+    for _ in range(docs):
+        doc_lines = []
+        for _ in range(lines):
+            roll = rng.random()
+            if roll < 0.1:
+                doc_lines.append("")
+            elif roll < 0.25:
+                doc_lines.append(rng.choice(boilerplate))
+            else:
+                words = rng.randint(4, 20)
+                doc_lines.append(" ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + ".")
+        corpus.append("\n".join(doc_lines))
+    return corpus
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def run_scenario(args) -> dict:
+    from async_translator import AsyncGoogleTranslator, shared_loop
+    from batch import BatchTranslator
+    from google_translator import GoogleTranslator
+    from http_session import PooledSession
+    from rate_limiter import AdaptiveRateLimiter
+    from translation_memory import TranslationMemory
+
+    latencies = []
+
+    class TimedSession(PooledSession):
+        def get(self, url, **kwargs):
+            started = time.perf_counter()
+            try:
+                return super().get(url, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+    translator = GoogleTranslator(
+        memory=TranslationMemory(':memory:'),
+        session=TimedSession(pool_size=max(args.concurrency, args.workers)),
+        limiter=AdaptiveRateLimiter(initial_rate=args.rate, max_rate=args.rate, burst=args.rate),
+    )
+    translator.base_url = args.url
+
+    corpus = build_corpus(args.docs, args.lines, args.seed)
+    segments = [line for doc in corpus for line in doc.split("\n") if line.strip()]
+    chars = sum(len(doc) for doc in corpus)
+
+    started = time.perf_counter()
+    if args.child == 'translate':
+        for doc in corpus:
+            translator.translate_strict(doc, 'en', 'pt')
+    elif args.child == 'translate_with_progress':
+        for doc in corpus:
+            translator.translate_with_progress(doc)
+    elif args.child == 'translate_many':
+        engine = AsyncGoogleTranslator(translator, concurrency=args.concurrency)
+        shared_loop().submit(engine.translate_many(segments)).result()
+    elif args.child == 'batch':
+        with tempfile.TemporaryDirectory() as folder:
+            jobs = []
+            for i, doc in enumerate(corpus):
+                path = os.path.join(folder, 'in', f'doc{i}.txt')
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(doc)
+                jobs.append((f'doc{i}.txt', path, os.path.join(folder, 'out', f'doc{i}.txt')))
+            started = time.perf_counter()
+            BatchTranslator(translator.translate_with_progress, workers=args.workers).run(jobs)
+    elapsed = time.perf_counter() - started
+
+    return {
+        'scenario': args.child,
+        'elapsed_s': round(elapsed, 3),
+        'requests': len(latencies),
+        'segments': len(segments),
+        'segments_per_s': round(len(segments) / elapsed, 1),
+        'chars_per_s': round(chars / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        # ru_maxrss vem em KiB no Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark de débito do GoogleTranslator.")
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--docs', type=int, default=20, help="documentos no corpus")
+    parser.add_argument('--lines', type=int, default=60, help="linhas por documento")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=30.0, help="latência do servidor (ms)")
+    parser.add_argument('--jitter', type=float, default=5.0, help="jitter do servidor (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--rate', type=float, default=1000.0, help="limite de requisições/s do cliente")
+    parser.add_argument('--concurrency', type=int, default=8, help="concorrência de translate_many")
+    parser.add_argument('--workers', type=int, default=4, help="workers do BatchTranslator")
+    parser.add_argument('--json', help="guarda os resultados neste ficheiro")
+    parser.add_argument('--baseline', help="compara com resultados guardados com --json")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="regressão máxima aceite face à baseline (fração)")
+    parser.add_argument('--child', choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    return parser
+
+
+def compare(results, baseline_path, tolerance) -> int:
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {row['scenario']: row for row in json.load(f)}
+    regressions = 0
+    for row in results:
+        before = baseline.get(row['scenario'])
+        if not before:
+            continue
+        if row['segments_per_s'] < before['segments_per_s'] * (1 - tolerance):
+            regressions += 1
+            print(f"REGRESSÃO {row['scenario']}: {before['segments_per_s']} -> {row['segments_per_s']} seg/s")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.child:
+        print(json.dumps(run_scenario(args)))
+        return 0
+
+    results = []
+    with MockTranslateServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             throttle_rate=args.throttle_rate, seed=args.seed) as server:
+        for scenario in args.scenarios:
+            command = [sys.executable, os.path.abspath(__file__), '--child', scenario, '--url', server.url,
+                       '--docs', str(args.docs), '--lines', str(args.lines), '--seed', str(args.seed),
+                       '--rate', str(args.rate), '--concurrency', str(args.concurrency),
+                       '--workers', str(args.workers)]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    columns = ('scenario', 'requests', 'segments_per_s', 'chars_per_s', 'p50_ms', 'p99_ms', 'peak_rss_mb')
+    print("  ".join(f"{column:>24}" for column in columns))
+    for row in results:
+        print("  ".join(f"{row[column]!s:>24}" for column in columns))
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        return compare(results, args.baseline, args.tolerance)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Verificação do pré-filtro: frases que já foram mal classificadas.
+
+Cada caso diz a regra esperada de SegmentFilter.classify_one (None = traduzir).
+O código de saída é 1 se algum caso falhar.
+
+    python benchmarks/check_prefilter.py
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from prefilter import RULE_CODE, RULE_TARGET_LANGUAGE, RULE_TIMESTAMPS, SegmentFilter  # noqa: E402
+
+# (segmento, origem, destino, regra esperada)
+CASES = [
+    # Inglês com palavras que também são portuguesas (a, as, no, do)
+    ("Take a seat, have a drink.", 'en', 'pt', None),
+    ("I see a cat and a dog", 'en', 'pt', None),
+    ("As a rule, do no harm.", 'en', 'pt', None),
+    ("No, I do not know as much as you do.", 'en', 'pt', None),
+    ("Email me at a@b.com", 'en', 'pt', None),
+    ("O gato está em cima da mesa e não quer sair.", 'en', 'pt', RULE_TARGET_LANGUAGE),
+    # Escrita partilhada: ucraniano não é russo
+    ("Привіт, як справи у тебе сьогодні?", 'en', 'ru', None),
+    # Só datas numéricas passam
+    ("Monday, March 3, 2024", 'en', 'pt', None),
+    ("2024-03-01T10:15:30Z", 'en', 'pt', RULE_TIMESTAMPS),
+    # Prosa com cara de código
+    ("class notes: bring a pen", 'en', 'pt', None),
+    ("return the book by Friday;", 'en', 'pt', None),
+    ("import this", 'en', 'pt', None),
+    ("SELECT your items FROM the list", 'en', 'pt', None),
+    ("The cat (see [1], [2], [3])", 'en', 'pt', None),
+    ("class Foo(Base):", 'en', 'pt', RULE_CODE),
+    ("return x + 1;", 'en', 'pt', RULE_CODE),
+    ("import numpy as np", 'en', 'pt', RULE_CODE),
+    ("SELECT name, age FROM users WHERE id = 1", 'en', 'pt', RULE_CODE),
+]
+
+
+def main() -> int:
+    segment_filter = SegmentFilter()
+    failures = 0
+    for segment, source_lang, target_lang, expected in CASES:
+        rule = segment_filter.classify_one(segment, source_lang, target_lang)
+        if rule != expected:
+            failures += 1
+            print(f"FALHOU {source_lang}->{target_lang} {segment!r}: {rule} (esperado {expected})")
+    print(f"{len(CASES) - failures}/{len(CASES)} casos corretos")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
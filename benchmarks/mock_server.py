@@ -0,0 +1,168 @@
+"""
+Servidor local que imita o endpoint translate_a/single?client=gtx.
+
+Responde no mesmo formato JSON do Google ([[["tradução", "original", ...]], ...])
+com o parâmetro q transformado, e permite simular latência, jitter, erros 5xx
+e respostas 429 com Retry-After.
+
+    python benchmarks/mock_server.py --port 8765 --latency 80 --jitter 20 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRANSFORMS = {
+    'echo': lambda text: text,
+    'upper': str.upper,
+    'reverse': lambda text: '\n'.join(line[::-1] for line in text.split('\n')),
+}
+
+
+class MockTranslateServer:
+    """
+    Servidor gtx falso numa thread de fundo.
+
+    Args:
+        latency: Latência base por requisição, em milissegundos
+        jitter: Variação aleatória (+/-) da latência, em milissegundos
+        error_rate: Fração de requisições que recebem 500
+        throttle_rate: Fração de requisições que recebem 429
+        max_rps: Acima destas requisições por segundo responde 429 (0 desliga)
+        retry_after: Valor do cabeçalho Retry-After das respostas 429
+        transform: 'echo', 'upper' ou 'reverse'
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, max_rps: float = 0.0,
+                 retry_after: int = 1, transform: str = 'upper', seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self.transform = TRANSFORMS[transform]
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/translate_a/single"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _decide(self):
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            over_limit = self.max_rps and self._window_count > self.max_rps
+            roll = self._random.random()
+            delay = max(self.latency + self._random.uniform(-self.jitter, self.jitter), 0.0) / 1000
+            if over_limit or roll < self.throttle_rate:
+                self.throttled += 1
+                return 429, delay
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return 500, delay
+            return 200, delay
+
+    def _handle(self, handler: BaseHTTPRequestHandler):
+        parsed = urllib.parse.urlparse(handler.path)
+        params = urllib.parse.parse_qs(parsed.query, keep_blank_values=True)
+        status, delay = self._decide()
+        time.sleep(delay)
+
+        headers = {}
+        if parsed.path != '/translate_a/single' or params.get('client') != ['gtx']:
+            status, body = 404, b'[]'
+        elif status == 200:
+            text = params.get('q', [''])[0]
+            translated = self.transform(text)
+            body = json.dumps(
+                [[[translated, text, None, None, 10]], None, params.get('sl', ['auto'])[0]],
+                ensure_ascii=False
+            ).encode('utf-8')
+        else:
+            body = b'{"error": "simulated"}'
+            if status == 429:
+                headers['Retry-After'] = str(self.retry_after)
+
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self) -> 'MockTranslateServer':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-gtx', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor gtx falso para testes de desempenho.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=50.0, help="latência base (ms)")
+    parser.add_argument('--jitter', type=float, default=10.0, help="variação da latência (ms)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fração de respostas 500")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="fração de respostas 429")
+    parser.add_argument('--max-rps', type=float, default=0.0, help="429 acima deste ritmo (0 desliga)")
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--transform', choices=sorted(TRANSFORMS), default='upper')
+    args = parser.parse_args()
+
+    server = MockTranslateServer(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                                 args.throttle_rate, args.max_rps, args.retry_after, args.transform)
+    print(f"A servir em {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
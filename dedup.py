@@ -0,0 +1,134 @@
+import concurrent.futures
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import metrics
+from segmenter import DEFAULT_MAX_ENCODED, segment_text
+
+# Um segmento entra na fase de deduplicação quando aparece pelo menos este número de vezes no lote
+DEDUP_MIN_COUNT = 2
+# Limites da fase de deduplicação: caracteres lidos no lote e segmentos diferentes contados
+DEDUP_MAX_CHARS = 64 * 1024 * 1024
+DEDUP_MAX_DISTINCT = 500_000
+
+COALESCED = metrics.METRICS.counter('translator_coalesced_segments_total',
+                                    "Segmentos servidos por uma requisição em curso de outro worker")
+DEDUP_SEGMENTS = metrics.METRICS.counter('translator_dedup_segments_total',
+                                         "Segmentos repetidos traduzidos uma vez na fase de deduplicação")
+DEDUP_COPIES = metrics.METRICS.counter('translator_dedup_copies_total',
+                                       "Cópias de segmentos repetidos servidas pela fase de deduplicação")
+
+
+class SingleFlight:
+    """
+    Junta pedidos iguais que estão em curso ao mesmo tempo.
+
+    O primeiro worker a pedir uma chave fica responsável por ela (líder) e
+    resolve-a com resolve() ou fail(); os outros recebem o mesmo Future e
+    esperam pelo resultado em vez de fazerem a sua própria requisição.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, key: str) -> Tuple[bool, concurrent.futures.Future]:
+        """
+        Returns:
+            (True, future) se quem chama passou a ser o líder da chave;
+            (False, future) se já havia um pedido em curso
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return False, future
+            future = self._inflight[key] = concurrent.futures.Future()
+            return True, future
+
+    def _finish(self, key: str) -> Optional[concurrent.futures.Future]:
+        with self._lock:
+            return self._inflight.pop(key, None)
+
+    def resolve(self, key: str, value):
+        future = self._finish(key)
+        if future is not None:
+            future.set_result(value)
+
+    def fail(self, key: str, error: BaseException):
+        future = self._finish(key)
+        if future is not None:
+            future.set_exception(error)
+
+    def __len__(self):
+        return len(self._inflight)
+
+
+_shared_inflight: Optional[SingleFlight] = None
+_shared_lock = threading.Lock()
+
+
+def shared_inflight() -> SingleFlight:
+    """Devolve o registo de pedidos em curso partilhado por todos os GoogleTranslator."""
+    global _shared_inflight
+    with _shared_lock:
+        if _shared_inflight is None:
+            _shared_inflight = SingleFlight()
+        return _shared_inflight
+
+
+def _segment_hash(segment: str) -> bytes:
+    return hashlib.blake2b(segment.encode('utf-8'), digest_size=8).digest()
+
+
+def repeated_segments(paths: Iterable[str], max_encoded: int = DEFAULT_MAX_ENCODED,
+                      min_count: int = DEDUP_MIN_COUNT, max_chars: int = DEDUP_MAX_CHARS,
+                      max_distinct: int = DEDUP_MAX_DISTINCT) -> List[str]:
+    """
+    Segmentos que aparecem pelo menos ``min_count`` vezes no conjunto dos ficheiros.
+
+    Usa a mesma segmentação de GoogleTranslator.translate_with_progress, por
+    isso cada segmento devolvido corresponde exatamente a uma entrada da
+    memória de tradução. Os ficheiros são lidos linha a linha e só se contam
+    hashes de 8 bytes; um segmento é guardado quando chega a ``min_count``.
+
+    Args:
+        paths: Ficheiros a percorrer, por ordem; os que não se leem (ou não
+            são UTF-8) são ignorados
+        max_chars: Caracteres lidos no máximo, no conjunto dos ficheiros;
+            o resto do lote não entra na contagem
+        max_distinct: Segmentos diferentes contados no máximo; depois disso só
+            os já vistos continuam a ser contados
+
+    Returns:
+        Os segmentos repetidos, pela ordem em que atingiram ``min_count``
+    """
+    counts: Dict[bytes, int] = {}
+    repeated = []
+    budget = max_chars
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    budget -= len(line)
+                    if budget < 0:
+                        break
+                    for segment in segment_text(line, max_encoded).segments:
+                        key = _segment_hash(segment)
+                        count = counts.get(key)
+                        if count is None:
+                            if len(counts) < max_distinct:
+                                counts[key] = 1
+                            continue
+                        counts[key] = count + 1
+                        if count + 1 == min_count:
+                            repeated.append(segment)
+        except (OSError, UnicodeDecodeError):
+            # O erro é reportado quando o ficheiro for traduzido; as linhas já
+            # lidas continuam contadas
+            continue
+        if budget < 0:
+            break
+    DEDUP_SEGMENTS.inc(len(repeated))
+    DEDUP_COPIES.inc(sum(counts[_segment_hash(segment)] - 1 for segment in repeated))
+    return repeated
@@ -0,0 +1,372 @@
+"""
+Editor lado a lado: texto original à esquerda, tradução à direita.
+
+O ParagraphDocument divide o texto em parágrafos (blocos separados por
+linhas vazias) e, a cada edição, compara-os com os anteriores para saber
+que blocos mudaram. Só esses ficam por traduzir, e o painel da tradução é
+corrigido no lugar (apagar e inserir apenas as linhas desses blocos), em
+vez de o documento inteiro ser retraduzido e reconstruído.
+
+No modo automático (``live``) a tradução começa LIVE_DELAY_MS depois da
+última tecla, a partir do parágrafo onde está o cursor. Há no máximo um
+pedido automático em curso: uma nova edição torna-o obsoleto e ele não pede
+os grupos seguintes; as traduções de parágrafos que entretanto mudaram são
+descartadas.
+"""
+import itertools
+import re
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from segmenter import DEFAULT_MAX_ENCODED
+
+# Uma ou mais linhas vazias (com espaços ou tabs) separam parágrafos
+PARAGRAPH_BREAK = re.compile(r'(\n(?:[ \t]*\n)+)')
+SYNC_DELAY_MS = 120
+LIVE_DELAY_MS = 400
+PENDING_TAG = 'pendente'
+
+# (início, fim, [(texto, pendente), ...]) em índices do tk.Text da tradução
+Patch = Tuple[str, str, List[Tuple[str, bool]]]
+
+
+def split_blocks(text: str) -> List[str]:
+    """Parágrafos com as linhas vazias que os seguem; ''.join(blocos) == text."""
+    parts = PARAGRAPH_BREAK.split(text)
+    blocks = [parts[i] + (parts[i + 1] if i + 1 < len(parts) else '') for i in range(0, len(parts), 2)]
+    return [block for block in blocks if block]
+
+
+def split_like(translated: str, sources: Sequence[str]) -> Optional[List[str]]:
+    """
+    Parte a tradução de ''.join(sources) nos mesmos blocos, pelas quebras
+    de linha (a segmentação preserva-as). None se o número de linhas mudou.
+    """
+    if translated.count('\n') != sum(source.count('\n') for source in sources):
+        return None
+    pieces = []
+    rest = translated
+    for source in sources[:-1]:
+        cut = -1
+        for _ in range(source.count('\n')):
+            cut = rest.index('\n', cut + 1)
+        pieces.append(rest[:cut + 1])
+        rest = rest[cut + 1:]
+    pieces.append(rest)
+    return pieces
+
+
+def translate_blocks(translate_text: Callable[[str], str], pending: Sequence[Tuple[int, str]],
+                     max_chars: int = DEFAULT_MAX_ENCODED,
+                     cancelled: Optional[Callable[[], bool]] = None) -> Iterator[Tuple[int, str, str]]:
+    """
+    Traduz blocos pendentes juntando vários numa só chamada até ``max_chars``.
+
+    Um bloco só se junta ao grupo se o anterior terminar em '\n'; o último
+    parágrafo do texto não termina e, quando não vem no fim (por exemplo
+    traduzido primeiro por ter o cursor), fica num grupo só seu.
+
+    Se ``cancelled()`` for verdadeiro antes de um grupo, pára sem o pedir.
+
+    Yields:
+        (id do bloco, texto original, tradução), à medida que cada grupo fica pronto
+    """
+    group: List[Tuple[int, str]] = []
+    size = 0
+    for item in itertools.chain(pending, [None]):
+        if item is not None and (not group or (size + len(item[1]) <= max_chars
+                                               and group[-1][1].endswith('\n'))):
+            group.append(item)
+            size += len(item[1])
+            continue
+
+        if cancelled is not None and cancelled():
+            return
+        sources = [source for _, source in group]
+        pieces = split_like(translate_text(''.join(sources)), sources)
+        if pieces is None:
+            # O serviço juntou ou partiu linhas: traduz o grupo bloco a bloco
+            pieces = [translate_text(source) for source in sources]
+        for (block_id, source), translated in zip(group, pieces):
+            yield block_id, source, translated
+
+        if item is not None:
+            group, size = [item], len(item[1])
+
+
+class ParagraphDocument:
+    """
+    Blocos do texto original e a tradução de cada um (None = por traduzir).
+
+    Cada bloco tem um id que muda quando o bloco é editado, para que uma
+    tradução pedida antes da edição seja reconhecida e descartada.
+    """
+
+    def __init__(self):
+        self.blocks: List[str] = []
+        self.ids: List[int] = []
+        self.translations: List[Optional[str]] = []
+        # Quebras de linha do que está no painel da tradução, por bloco
+        self.shown_lines: List[int] = []
+        self._ids = itertools.count()
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def shown(self, index: int) -> str:
+        """O que o painel da tradução mostra para o bloco: a tradução ou, pendente, o original."""
+        translated = self.translations[index]
+        return self.blocks[index] if translated is None else translated
+
+    def text(self) -> str:
+        return ''.join(self.shown(i) for i in range(len(self.blocks)))
+
+    def pending(self) -> List[Tuple[int, str]]:
+        return [(self.ids[i], block) for i, block in enumerate(self.blocks) if self.translations[i] is None]
+
+    def block_at_line(self, line: int) -> Optional[int]:
+        """Bloco que contém a linha ``line`` (1 = primeira) do texto original."""
+        first = 1
+        for index, block in enumerate(self.blocks):
+            first += block.count('\n')
+            if line < first or (line == first and not block.endswith('\n')):
+                return index
+        return len(self.blocks) - 1 if self.blocks else None
+
+    def _patch(self, start: int, end: int, change: Callable[[], int]) -> Patch:
+        # Posição, no painel da tradução, dos blocos start..end antes de change()
+        first_line = 1 + sum(self.shown_lines[:start])
+        old_lines = sum(self.shown_lines[start:end])
+        to_end = start < end == len(self.blocks) and not self.shown(end - 1).endswith('\n')
+        new_end = change()
+        end_index = 'end-1c' if to_end else f"{first_line + old_lines}.0"
+        pieces = [(self.shown(i), self.translations[i] is None) for i in range(start, new_end)]
+        return f"{first_line}.0", end_index, pieces
+
+    def update(self, text: str) -> Optional[Patch]:
+        """
+        Atualiza os blocos a partir do texto completo do editor.
+
+        Os blocos iguais no início e no fim mantêm-se (com a tradução); os do
+        meio passam a pendentes. Devolve a correção a aplicar ao painel da
+        tradução, ou None se nada mudou.
+        """
+        new_blocks = split_blocks(text)
+        old_blocks = self.blocks
+        start = 0
+        limit = min(len(old_blocks), len(new_blocks))
+        while start < limit and old_blocks[start] == new_blocks[start]:
+            start += 1
+        old_end, new_end = len(old_blocks), len(new_blocks)
+        while old_end > start and new_end > start and old_blocks[old_end - 1] == new_blocks[new_end - 1]:
+            old_end -= 1
+            new_end -= 1
+        if start == old_end and start == new_end:
+            return None
+
+        def change():
+            added = new_blocks[start:new_end]
+            self.blocks[start:old_end] = added
+            self.ids[start:old_end] = [next(self._ids) for _ in added]
+            # Blocos só com espaço em branco não precisam de tradução
+            self.translations[start:old_end] = [block if not block.strip() else None for block in added]
+            self.shown_lines[start:old_end] = [block.count('\n') for block in added]
+            return start + len(added)
+
+        return self._patch(start, old_end, change)
+
+    def set_translation(self, block_id: int, source: str, translated: str) -> Optional[Patch]:
+        """Guarda a tradução de um bloco; None se o bloco entretanto mudou ou desapareceu."""
+        try:
+            index = self.ids.index(block_id)
+        except ValueError:
+            return None
+        if self.blocks[index] != source or not translated:
+            return None
+
+        def change():
+            self.translations[index] = translated
+            self.shown_lines[index] = translated.count('\n')
+            return index + 1
+
+        return self._patch(index, index + 1, change)
+
+
+class SideBySideEditor(ttk.Frame):
+    """
+    Editor com o original e a tradução lado a lado, traduzindo só os parágrafos alterados.
+
+    Args:
+        jobs: TkJobRunner onde correm as traduções
+        translate_text: Função texto -> tradução (por exemplo GoogleTranslator.translate_strict)
+        on_live_status: Recebe mensagens curtas do modo automático (por exemplo para a barra de estado)
+        **text_options: Opções do tk.Text do original (por exemplo undo=True)
+    """
+
+    def __init__(self, master, jobs, translate_text: Callable[[str], str],
+                 on_live_status: Optional[Callable[[str], None]] = None, **text_options):
+        super().__init__(master)
+        self.jobs = jobs
+        self.translate_text = translate_text
+        self.on_live_status = on_live_status
+        self.document = ParagraphDocument()
+        self._sync_job = None
+        # Modo automático: a variável pode ser ligada a um Checkbutton
+        self.live = tk.BooleanVar(value=False)
+        self.live.trace_add('write', lambda *args: self.live.get() and self._schedule_live())
+        self._live_job = None
+        self._live_generation = 0
+        self._live_running = False
+        self._live_again = False
+
+        panes = ttk.PanedWindow(self, orient='horizontal')
+        panes.pack(side='left', expand=True, fill='both')
+        self.source = tk.Text(panes, wrap=tk.WORD, **text_options)
+        self.target = tk.Text(panes, wrap=tk.WORD, state='disabled', background='#f7f7f7')
+        self.target.tag_configure(PENDING_TAG, foreground='gray55')
+        panes.add(self.source, weight=1)
+        panes.add(self.target, weight=1)
+
+        # Uma barra de rolagem para os dois painéis
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.source.configure(yscrollcommand=self._on_source_scroll)
+
+        self.source.bind('<<Modified>>', self._on_modified)
+
+    # Sincronização
+
+    def _on_modified(self, event=None):
+        # O Tk só volta a gerar <<Modified>> depois de a marca ser limpa
+        if not self.source.edit_modified():
+            return
+        self.source.edit_modified(False)
+        if self._sync_job is None:
+            self._sync_job = self.after(SYNC_DELAY_MS, self.sync)
+        if self.live.get():
+            self._schedule_live()
+
+    def sync(self) -> bool:
+        """Compara o texto com os blocos conhecidos e corrige o painel da tradução; True se mudou algo."""
+        if self._sync_job is not None:
+            self.after_cancel(self._sync_job)
+            self._sync_job = None
+        patch = self.document.update(self.source.get('1.0', 'end-1c'))
+        if patch is None:
+            return False
+        self._apply(patch)
+        return True
+
+    def _apply(self, patch: Patch):
+        start, end, pieces = patch
+        self.target.configure(state='normal')
+        self.target.delete(start, end)
+        self.target.mark_set('correcao', start)
+        self.target.mark_gravity('correcao', 'right')
+        for text, pending in pieces:
+            self.target.insert('correcao', text, (PENDING_TAG,) if pending else ())
+        self.target.configure(state='disabled')
+
+    def _on_scrollbar(self, *args):
+        self.source.yview(*args)
+        self.target.yview(*args)
+
+    def _on_source_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.target.yview_moveto(first)
+
+    # Tradução
+
+    def has_pending(self) -> bool:
+        self.sync()
+        return bool(self.document.pending())
+
+    def translated_text(self) -> str:
+        self.sync()
+        return self.document.text()
+
+    def translate_pending(self, on_progress: Optional[Callable[[float], None]] = None,
+                          on_done: Optional[Callable[[int], None]] = None,
+                          on_error: Optional[Callable[[Exception], None]] = None,
+                          first_line: Optional[int] = None,
+                          cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        Traduz em segundo plano os parágrafos pendentes e corrige o painel à medida que chegam.
+
+        Traduções de parágrafos editados entretanto são descartadas e esses
+        parágrafos continuam pendentes. on_done recebe o número de parágrafos
+        aplicados. Devolve False se não havia nada para traduzir.
+
+        Args:
+            first_line: O parágrafo que contém esta linha é traduzido primeiro
+            cancelled: Consultada antes de cada grupo; se verdadeira, os restantes não são pedidos
+        """
+        self.sync()
+        pending = self.document.pending()
+        if not pending:
+            return False
+        if first_line is not None:
+            index = self.document.block_at_line(first_line)
+            first_id = self.document.ids[index] if index is not None else None
+            pending.sort(key=lambda item: item[0] != first_id)
+        total = len(pending)
+        applied = 0
+        received = 0
+
+        def job(progress):
+            for result in translate_blocks(self.translate_text, pending, cancelled=cancelled):
+                progress(*result)
+
+        def translated(block_id, source, text):
+            nonlocal applied, received
+            received += 1
+            patch = self.document.set_translation(block_id, source, text)
+            if patch is not None:
+                applied += 1
+                self._apply(patch)
+            if on_progress:
+                on_progress(received / total * 100)
+
+        self.jobs.submit(job, on_progress=translated,
+                         on_done=lambda result: on_done and on_done(applied), on_error=on_error)
+        return True
+
+    # Modo automático
+
+    def _schedule_live(self):
+        # Cada tecla adia o pedido e torna obsoleto o que estiver em curso
+        self._live_generation += 1
+        if self._live_job is not None:
+            self.after_cancel(self._live_job)
+        self._live_job = self.after(LIVE_DELAY_MS, self._run_live)
+
+    def _run_live(self):
+        self._live_job = None
+        if not self.live.get():
+            return
+        if self._live_running:
+            # Só um pedido automático de cada vez: este corre quando o atual terminar
+            self._live_again = True
+            return
+
+        generation = self._live_generation
+        line = int(self.source.index('insert').split('.')[0])
+
+        def finished(applied=None):
+            self._live_running = False
+            if self._live_again:
+                self._live_again = False
+                self._run_live()
+            elif applied is not None and self.on_live_status:
+                self.on_live_status("Tradução atualizada")
+
+        def failed(error):
+            if self.on_live_status:
+                self.on_live_status(f"Erro na tradução automática: {error}")
+            finished()
+
+        self._live_running = self.translate_pending(
+            on_done=finished, on_error=failed, first_line=line,
+            cancelled=lambda: generation != self._live_generation,
+        )
@@ -0,0 +1,342 @@
+"""
+Lista de ficheiros virtualizada para os separadores de tradução em lote.
+
+Os ficheiros ficam num índice em memória (FileIndex) e o VirtualFileList só
+desenha num Canvas as linhas visíveis, reaproveitando sempre os mesmos itens;
+filtrar, ordenar e selecionar tudo mexem apenas no índice, sem widgets nem
+strings Tcl por linha.
+"""
+import fnmatch
+import time
+import tkinter as tk
+from array import array
+from tkinter import font as tkfont
+from tkinter import ttk
+from typing import Dict, Iterable, List, Optional
+
+from file_scanner import ScannedFile
+
+# (chave, título, fração da largura)
+COLUMNS = (
+    ('name', "Nome", 0.55),
+    ('size', "Tamanho", 0.13),
+    ('mtime', "Modificado", 0.2),
+    ('status', "Estado", 0.12),
+)
+FILTER_DELAY_MS = 150
+SELECTED_BACKGROUND = '#cde3fa'
+
+
+def format_size(size: int) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class FileIndex:
+    """
+    Ficheiros de uma pasta em listas e arrays paralelos.
+
+    ``view`` contém as posições dos ficheiros visíveis (depois do filtro),
+    pela ordem atual; a seleção é um bytearray sobre o conjunto completo.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._folded: List[str] = []
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.statuses: Dict[int, str] = {}
+        self.selected = bytearray()
+        self.view = array('l')
+        self._positions: Dict[str, int] = {}
+        self._filter = ''
+        self.sort_key = 'name'
+        self.reverse = False
+
+    def __len__(self):
+        return len(self.names)
+
+    def load(self, files: Iterable[ScannedFile]):
+        self.names = []
+        self._folded = []
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.statuses = {}
+        self._positions = {}
+        for scanned in files:
+            self._positions[scanned.relpath] = len(self.names)
+            self.names.append(scanned.relpath)
+            self._folded.append(scanned.relpath.casefold())
+            self.sizes.append(scanned.size)
+            self.mtimes.append(scanned.mtime_ns)
+        self.selected = bytearray(len(self.names))
+        self.refresh()
+
+    def refresh(self):
+        """Reaplica o filtro e a ordenação."""
+        pattern = self._filter.casefold()
+        positions = range(len(self.names))
+        if pattern and any(char in pattern for char in '*?['):
+            positions = [i for i in positions if fnmatch.fnmatchcase(self._folded[i], pattern)]
+        elif pattern:
+            positions = [i for i in positions if pattern in self._folded[i]]
+
+        keys = {
+            'name': self._folded.__getitem__,
+            'size': self.sizes.__getitem__,
+            'mtime': self.mtimes.__getitem__,
+            'status': lambda i: self.statuses.get(i, ''),
+        }
+        self.view = array('l', sorted(positions, key=keys[self.sort_key], reverse=self.reverse))
+
+    def set_filter(self, text: str):
+        """Filtra por parte do nome ou, se tiver * ? [, por glob."""
+        self._filter = text.strip()
+        self.refresh()
+
+    def sort_by(self, key: str):
+        """Ordena pela coluna ``key``; repetir a mesma coluna inverte a ordem."""
+        self.reverse = not self.reverse if key == self.sort_key else False
+        self.sort_key = key
+        self.refresh()
+
+    def select_all(self):
+        """Seleciona todos os ficheiros visíveis (todos, se não houver filtro)."""
+        if len(self.view) == len(self.names):
+            self.selected = bytearray(b'\x01') * len(self.names)
+        else:
+            for i in self.view:
+                self.selected[i] = 1
+
+    def clear_selection(self):
+        self.selected = bytearray(len(self.names))
+
+    def select_rows(self, start: int, end: int, value: int = 1):
+        """Marca as linhas ``start..end`` (inclusive) da vista atual."""
+        if start > end:
+            start, end = end, start
+        for row in range(start, end + 1):
+            self.selected[self.view[row]] = value
+
+    def toggle_row(self, row: int):
+        i = self.view[row]
+        self.selected[i] ^= 1
+
+    def selected_count(self) -> int:
+        return self.selected.count(1)
+
+    def selected_names(self) -> List[str]:
+        return [self.names[i] for i in self.view if self.selected[i]]
+
+    def visible_names(self) -> List[str]:
+        return [self.names[i] for i in self.view]
+
+    def set_status(self, name: str, status: str) -> bool:
+        position = self._positions.get(name)
+        if position is None:
+            return False
+        self.statuses[position] = status
+        return True
+
+    def row_values(self, row: int) -> tuple:
+        i = self.view[row]
+        modified = time.strftime('%Y-%m-%d %H:%M', time.localtime(self.mtimes[i] / 1e9))
+        return self.names[i], format_size(self.sizes[i]), modified, self.statuses.get(i, '')
+
+
+class VirtualFileList(ttk.Frame):
+    """
+    Lista de ficheiros com filtro, ordenação por coluna e seleção múltipla.
+
+    Args:
+        height: Número de linhas visíveis inicialmente
+        selectmode: 'extended' (clique seleciona, Ctrl alterna, Shift estende)
+            ou 'multiple' (cada clique alterna a linha), como no tk.Listbox
+    """
+
+    def __init__(self, master, height: int = 15, selectmode: str = 'extended', **kwargs):
+        super().__init__(master, **kwargs)
+        self.index = FileIndex()
+        self.selectmode = selectmode
+        self._first = 0
+        self._anchor: Optional[int] = None
+        self._rows = []
+        self._filter_job = None
+        self._font = tkfont.nametofont('TkDefaultFont')
+        self.row_height = self._font.metrics('linespace') + 4
+
+        # Filtro e contagem
+        top = ttk.Frame(self)
+        top.pack(fill='x')
+        ttk.Label(top, text="Filtro:").pack(side='left')
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add('write', self._schedule_filter)
+        ttk.Entry(top, textvariable=self.filter_var, width=30).pack(side='left', padx=5)
+        self.count_label = ttk.Label(top, text="")
+        self.count_label.pack(side='right')
+
+        # Cabeçalhos: clicar ordena pela coluna
+        self.header = ttk.Frame(self)
+        self.header.pack(fill='x')
+        self._header_buttons = {}
+        for column, (key, title, weight) in enumerate(COLUMNS):
+            button = ttk.Button(self.header, text=title, command=lambda key=key: self.sort_by(key))
+            button.grid(row=0, column=column, sticky='ew')
+            self.header.columnconfigure(column, weight=int(weight * 100), uniform='columns')
+            self._header_buttons[key] = button
+
+        body = ttk.Frame(self)
+        body.pack(expand=True, fill='both')
+        self.canvas = tk.Canvas(body, height=height * self.row_height, background='white',
+                                highlightthickness=0, takefocus=True)
+        self.scrollbar = ttk.Scrollbar(body, orient='vertical', command=self._on_scrollbar)
+        self.canvas.pack(side='left', expand=True, fill='both')
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.canvas.bind('<Configure>', lambda event: self.redraw())
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<Shift-Button-1>', self._on_click)
+        self.canvas.bind('<Control-Button-1>', self._on_click)
+        self.canvas.bind('<MouseWheel>', self._on_wheel)
+        self.canvas.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.canvas.bind('<Button-5>', lambda event: self.scroll(3))
+        self.canvas.bind('<Prior>', lambda event: self.scroll(-self._visible_rows()))
+        self.canvas.bind('<Next>', lambda event: self.scroll(self._visible_rows()))
+        self.canvas.bind('<Home>', lambda event: self.scroll(-len(self.index.view)))
+        self.canvas.bind('<End>', lambda event: self.scroll(len(self.index.view)))
+        self.canvas.bind('<Control-a>', lambda event: self.select_all())
+
+    # Dados
+
+    def load(self, files: Iterable[ScannedFile]):
+        self.index.load(files)
+        self._first = 0
+        self._anchor = None
+        self.redraw()
+
+    def set_status(self, name: str, status: str):
+        if self.index.set_status(name, status):
+            self.redraw()
+
+    def select_all(self):
+        self.index.select_all()
+        self.redraw()
+
+    def clear_selection(self):
+        self.index.clear_selection()
+        self.redraw()
+
+    def selected_names(self) -> List[str]:
+        return self.index.selected_names()
+
+    def visible_names(self) -> List[str]:
+        return self.index.visible_names()
+
+    def sort_by(self, key: str):
+        self.index.sort_by(key)
+        self._anchor = None
+        for column_key, title, _ in COLUMNS:
+            arrow = (' ▼' if self.index.reverse else ' ▲') if column_key == key else ''
+            self._header_buttons[column_key].config(text=title + arrow)
+        self.redraw()
+
+    def _schedule_filter(self, *args):
+        # Espera que o utilizador pare de escrever antes de filtrar
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(FILTER_DELAY_MS, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_job = None
+        self.index.set_filter(self.filter_var.get())
+        self._first = 0
+        self._anchor = None
+        self.redraw()
+
+    # Desenho
+
+    def _visible_rows(self) -> int:
+        return max(self.canvas.winfo_height() // self.row_height, 1)
+
+    def _ensure_row_items(self, count: int):
+        while len(self._rows) < count:
+            background = self.canvas.create_rectangle(0, 0, 0, 0, width=0)
+            texts = [self.canvas.create_text(0, 0, anchor='w', font=self._font) for _ in COLUMNS]
+            self._rows.append((background, texts))
+
+    def redraw(self):
+        total = len(self.index.view)
+        visible = self._visible_rows()
+        self._first = max(min(self._first, total - visible), 0)
+        width = self.canvas.winfo_width()
+        self._ensure_row_items(visible + 1)
+
+        offsets = []
+        x = 0.0
+        for _, _, weight in COLUMNS:
+            offsets.append(x + 4)
+            x += weight * width
+
+        for slot, (background, texts) in enumerate(self._rows):
+            row = self._first + slot
+            if slot > visible or row >= total:
+                self.canvas.itemconfigure(background, state='hidden')
+                for item in texts:
+                    self.canvas.itemconfigure(item, state='hidden')
+                continue
+
+            top = slot * self.row_height
+            selected = self.index.selected[self.index.view[row]]
+            self.canvas.coords(background, 0, top, width, top + self.row_height)
+            self.canvas.itemconfigure(background, state='normal',
+                                      fill=SELECTED_BACKGROUND if selected else 'white')
+            for item, value, x in zip(texts, self.index.row_values(row), offsets):
+                self.canvas.coords(item, x, top + self.row_height / 2)
+                self.canvas.itemconfigure(item, state='normal', text=value)
+
+        if total:
+            self.scrollbar.set(self._first / total, min((self._first + visible) / total, 1.0))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+        self.count_label.config(
+            text=f"{total} de {len(self.index)} ficheiros, {self.index.selected_count()} selecionados"
+        )
+
+    # Eventos
+
+    def scroll(self, rows: int):
+        self._first += rows
+        self.redraw()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == 'moveto':
+            self._first = int(float(value) * len(self.index.view))
+            self.redraw()
+        elif action == 'scroll':
+            self.scroll(int(value) * (self._visible_rows() if unit == 'pages' else 1))
+
+    def _on_wheel(self, event):
+        # No Windows delta vem em múltiplos de 120; no macOS em unidades pequenas
+        steps = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-steps * 3)
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        row = self._first + event.y // self.row_height
+        if row >= len(self.index.view):
+            return
+
+        shift = event.state & 0x0001
+        control = event.state & 0x0004
+        if self.selectmode == 'multiple' or control:
+            self.index.toggle_row(row)
+        elif shift and self._anchor is not None:
+            self.index.select_rows(self._anchor, row)
+        else:
+            self.index.clear_selection()
+            self.index.select_rows(row, row)
+        if not shift:
+            self._anchor = row
+        self.redraw()
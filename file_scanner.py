@@ -0,0 +1,106 @@
+import fnmatch
+import os
+from typing import Iterator, Optional, Sequence, Tuple
+
+DEFAULT_INCLUDE = ('*.txt',)
+
+
+class ScannedFile:
+    """Ficheiro encontrado por scan_files, com o stat obtido durante a listagem."""
+
+    __slots__ = ('relpath', 'path', 'size', 'mtime_ns')
+
+    def __init__(self, relpath: str, path: str, size: int, mtime_ns: int):
+        self.relpath = relpath
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @property
+    def fingerprint(self) -> Tuple[int, int]:
+        """O mesmo formato de journal.file_fingerprint."""
+        return self.size, self.mtime_ns
+
+    def __repr__(self):
+        return f"ScannedFile({self.relpath!r}, {self.size})"
+
+
+def _matches(relpath: str, name: str, patterns: Sequence[str]) -> bool:
+    # Padrões com '/' comparam o caminho relativo (um '/' inicial só ancora na raiz); os outros só o nome
+    return any(fnmatch.fnmatch(relpath, pattern.lstrip('/')) if '/' in pattern else fnmatch.fnmatch(name, pattern)
+               for pattern in patterns)
+
+
+def scan_files(root: str, include: Sequence[str] = DEFAULT_INCLUDE, exclude: Sequence[str] = (),
+               recursive: bool = True) -> Iterator[ScannedFile]:
+    """
+    Percorre ``root`` com os.scandir e devolve os ficheiros à medida que os encontra.
+
+    Os caminhos relativos usam sempre '/'. As pastas que correspondem a
+    ``exclude`` não são percorridas; as ligações simbólicas para pastas não
+    são seguidas. Dentro de cada pasta a ordem é alfabética.
+
+    Args:
+        root: Pasta de entrada
+        include: Padrões glob dos ficheiros a devolver (por exemplo '*.txt')
+        exclude: Padrões glob de ficheiros ou pastas a ignorar (por exemplo '.git', 'rascunhos/*')
+        recursive: Se False, lista só a própria pasta
+    """
+    stack = ['']
+    while stack:
+        relative_dir = stack.pop()
+        try:
+            with os.scandir(os.path.join(root, relative_dir)) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            relpath = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+            if _matches(relpath, entry.name, exclude):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        subdirs.append(relpath)
+                    continue
+                if not _matches(relpath, entry.name, include) or not entry.is_file():
+                    continue
+                stat = entry.stat()
+            except OSError:
+                continue
+            yield ScannedFile(relpath, entry.path, stat.st_size, stat.st_mtime_ns)
+
+        # Pilha invertida para percorrer as subpastas por ordem alfabética
+        stack.extend(reversed(subdirs))
+
+
+def mirror_path(output_root: str, relpath: str, suffix: Optional[str] = None) -> str:
+    """
+    Caminho de saída com a mesma estrutura de pastas da entrada.
+
+    Args:
+        suffix: Se indicado, substitui a extensão (por exemplo '_traduzido.txt')
+    """
+    if suffix is not None:
+        relpath = os.path.splitext(relpath)[0] + suffix
+    return os.path.join(output_root, *relpath.split('/'))
+
+
+def scan_jobs(input_root: str, output_root: str, include: Sequence[str] = DEFAULT_INCLUDE,
+              exclude: Sequence[str] = (), suffix: Optional[str] = None,
+              recursive: bool = True) -> Iterator[tuple]:
+    """
+    Tarefas para BatchTranslator.run geradas durante a listagem.
+
+    Se a pasta de saída estiver dentro da de entrada, não é percorrida.
+
+    Yields:
+        (caminho relativo, entrada, saída espelhada, fingerprint)
+    """
+    output_relative = os.path.relpath(os.path.abspath(output_root), os.path.abspath(input_root))
+    if not output_relative.startswith(os.pardir) and output_relative != os.curdir:
+        exclude = tuple(exclude) + ('/' + output_relative.replace(os.sep, '/'),)
+    for scanned in scan_files(input_root, include, exclude, recursive):
+        yield scanned.relpath, scanned.path, mirror_path(output_root, scanned.relpath, suffix), scanned.fingerprint
@@ -0,0 +1,409 @@
+import time
+import urllib.parse
+from typing import TYPE_CHECKING, Callable, Dict, Optional, Sequence
+
+import metrics
+from dedup import COALESCED, SingleFlight, shared_inflight
+from http_session import PooledSession, shared_session
+from prefilter import SegmentFilter
+from rate_limiter import AdaptiveRateLimiter, shared_limiter
+from resilience import (
+    CircuitBreaker, RetryPolicy, RETRYABLE_STATUS_CODES, parse_retry_after, shared_breaker
+)
+from segmenter import DEFAULT_MAX_ENCODED, Segmentation, pack_segments, segment_text
+from translation_memory import TranslationMemory, segment_key
+
+if TYPE_CHECKING:
+    import requests
+
+# Separador de segmentos dentro de um pacote; o endpoint gtx preserva as quebras de linha
+PACK_SEPARATOR = '\n'
+DEFAULT_PACK_BUDGET = DEFAULT_MAX_ENCODED
+
+
+class GoogleTranslator:
+    def __init__(self, memory: Optional[TranslationMemory] = None,
+                 session: Optional[PooledSession] = None,
+                 limiter: Optional[AdaptiveRateLimiter] = None,
+                 retry: Optional[RetryPolicy] = None,
+                 breaker: Optional[CircuitBreaker] = None,
+                 inflight: Optional[SingleFlight] = None,
+                 prefilter: Optional[SegmentFilter] = None):
+        self.base_url = "https://translate.googleapis.com/translate_a/single"
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+            'Accept-Language': 'en-US,en;q=0.5',
+        }
+        # A memória (SQLite) e a sessão (requests) só são abertas na primeira tradução
+        self._memory = memory
+        self._session = session
+        self.limiter = limiter if limiter is not None else shared_limiter()
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.breaker = breaker if breaker is not None else shared_breaker()
+        self.inflight = inflight if inflight is not None else shared_inflight()
+        # Segmentos que não precisam de tradução (números, URLs, código, ...); None desliga
+        self.prefilter = prefilter if prefilter is not None else SegmentFilter()
+
+    @property
+    def memory(self) -> TranslationMemory:
+        if self._memory is None:
+            self._memory = TranslationMemory.shared()
+        return self._memory
+
+    @property
+    def session(self) -> PooledSession:
+        if self._session is None:
+            self._session = shared_session()
+        return self._session
+
+    def report_error(self, message: str):
+        """
+        Mostra um erro de translate(). As interfaces gráficas não o usam: chamam
+        translate_strict ou translate_with_progress num TkJobRunner e recebem a
+        exceção no on_error, já na thread do Tk.
+        """
+        print(message)
+
+    def _get_with_retry(self, url: str) -> 'requests.Response':
+        """
+        Faz o GET com backoff exponencial para erros transitórios.
+
+        Ligações falhadas, timeouts e respostas 429/5xx são repetidos até
+        ``retry.max_attempts`` vezes; o Retry-After suspende todos os workers
+        através do disjuntor. Outros erros HTTP são lançados de imediato.
+        """
+        import requests
+
+        for attempt in range(1, self.retry.max_attempts + 1):
+            # Faz a requisição respeitando o disjuntor e o limitador partilhados
+            self.breaker.wait()
+            self.limiter.acquire()
+            if attempt > 1:
+                metrics.RETRIES.inc()
+            metrics.BYTES_SENT.inc(len(url))
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=self.headers)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.REQUEST_LATENCY.observe(time.perf_counter() - started)
+                metrics.REQUESTS.inc(status='erro-rede')
+                self.breaker.record_failure()
+                if attempt == self.retry.max_attempts:
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                continue
+            except Exception:
+                metrics.REQUESTS.inc(status='erro-rede')
+                self.breaker.record_failure()
+                raise
+
+            metrics.REQUEST_LATENCY.observe(time.perf_counter() - started)
+            metrics.REQUESTS.inc(status=response.status_code)
+            metrics.BYTES_RECEIVED.inc(len(response.content))
+            self.limiter.record_status(response.status_code)
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                self.breaker.record_success()
+                response.raise_for_status()
+                return response
+
+            self.breaker.record_failure()
+            if attempt == self.retry.max_attempts:
+                response.raise_for_status()
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                self.breaker.pause(retry_after)
+            time.sleep(self.retry.delay(attempt, retry_after))
+
+        raise RuntimeError("unreachable")
+
+    def _fetch(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        params = {
+            'client': 'gtx',
+            'sl': source_lang,
+            'tl': target_lang,
+            'dt': 't',
+            'q': text
+        }
+
+        # Codifica os parâmetros da URL
+        encoded_params = urllib.parse.urlencode(params)
+        url = f"{self.base_url}?{encoded_params}"
+
+        response = self._get_with_retry(url)
+
+        # Processa a resposta
+        result = response.json()
+        if result and isinstance(result[0], list):
+            translated_text = ''
+            for item in result[0]:
+                if item[0]:
+                    translated_text += item[0]
+            return translated_text
+
+        return None
+
+    def translate_strict(self, text: str, source_lang: str = 'en', target_lang: str = 'pt') -> Optional[str]:
+        """Como translate, mas lança as exceções em vez de as reportar."""
+        if not text.strip():
+            return ""
+
+        return self._translate_segmented(text, source_lang, target_lang)
+
+    def translate(self, text: str, source_lang: str = 'en', target_lang: str = 'pt') -> Optional[str]:
+        """
+        Traduz o texto usando o Google Translate
+
+        Args:
+            text: Texto para traduzir
+            source_lang: Idioma de origem (padrão: 'en')
+            target_lang: Idioma de destino (padrão: 'pt')
+
+        Returns:
+            Texto traduzido ou None em caso de erro
+        """
+        import requests
+
+        try:
+            return self.translate_strict(text, source_lang, target_lang)
+
+        except requests.RequestException as e:
+            self.report_error(f"Erro na requisição: {e}")
+            return None
+        except (IndexError, KeyError, ValueError) as e:
+            self.report_error(f"Erro ao processar resposta: {e}")
+            return None
+        except Exception as e:
+            self.report_error(f"Erro inesperado: {e}")
+            return None
+
+    def _fetch_and_store(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        translated = self._fetch(text, source_lang, target_lang)
+        if translated is not None:
+            self.memory.put(text, source_lang, target_lang, translated)
+        return translated
+
+    def _translate_pack(self, lines, source_lang: str, target_lang: str):
+        """Traduz linhas que já falharam na memória de tradução, numa só requisição se possível."""
+        metrics.SEGMENTS_PER_REQUEST.observe(len(lines))
+        if len(lines) == 1:
+            return [self._fetch_and_store(lines[0], source_lang, target_lang)]
+
+        result = self._fetch(PACK_SEPARATOR.join(lines), source_lang, target_lang)
+        parts = result.split(PACK_SEPARATOR) if result is not None else []
+        if len(parts) != len(lines):
+            # O serviço juntou ou partiu linhas: repete o pacote linha a linha
+            for _ in lines:
+                metrics.SEGMENTS_PER_REQUEST.observe(1)
+            return [self._fetch_and_store(line, source_lang, target_lang) for line in lines]
+
+        for line, part in zip(lines, parts):
+            self.memory.put(line, source_lang, target_lang, part)
+        return parts
+
+    def _translate_segmented(self, text: str, source_lang: str, target_lang: str,
+                             progress_callback=None, pack_budget: Optional[int] = DEFAULT_PACK_BUDGET,
+                             checkpoint=None) -> str:
+        """
+        Segmenta o texto (segmenter.py), traduz os segmentos em pacotes que
+        cabem em ``pack_budget`` e reconstrói o texto com os espaços e as
+        quebras de linha originais.
+        """
+        segmentation = segment_text(text, pack_budget or DEFAULT_MAX_ENCODED)
+        total = len(segmentation.segments)
+        done = 0
+
+        def advance(count):
+            nonlocal done
+            for _ in range(count):
+                done += 1
+                if progress_callback:
+                    progress_callback((done / total) * 100)
+
+        return self._translate_segmentation(segmentation, source_lang, target_lang, advance,
+                                            pack_budget, checkpoint)
+
+    def _translate_segmentation(self, segmentation: Segmentation, source_lang: str, target_lang: str,
+                                advance: Callable[[int], None], pack_budget: Optional[int] = DEFAULT_PACK_BUDGET,
+                                checkpoint=None) -> str:
+        """
+        Traduz uma segmentação já feita para ``target_lang``.
+
+        Cada segmento distinto é pedido uma só vez; se outro worker já o
+        estiver a pedir, espera por essa requisição (dedup.SingleFlight).
+        Os segmentos que o pré-filtro reconhece ficam como estão.
+        ``advance(n)`` é chamada sempre que mais n segmentos ficam prontos.
+        """
+        segments = segmentation.segments
+        translated_segments = list(segments)
+        pending = []
+        rules = self.prefilter.classify(segments, source_lang, target_lang) if self.prefilter else None
+        filtered: Dict[str, list] = {}
+
+        for i, segment in enumerate(segments):
+            if checkpoint is not None and i in checkpoint.segments:
+                translated_segments[i] = checkpoint.segments[i]
+                advance(1)
+                continue
+
+            if rules is not None and rules[i] is not None:
+                filtered.setdefault(rules[i], []).append(i)
+                advance(1)
+                continue
+
+            cached = self.memory.get(segment, source_lang, target_lang)
+            if cached is not None:
+                metrics.CACHE_HITS.inc()
+                translated_segments[i] = cached
+                advance(1)
+            else:
+                metrics.CACHE_MISSES.inc()
+                pending.append(i)
+
+        # Segmentos iguais dentro do texto são pedidos uma só vez
+        copies = {}
+        for i in pending:
+            copies.setdefault(segments[i], []).append(i)
+
+        def fill(segment, translated_text):
+            if translated_text is not None:
+                for i in copies[segment]:
+                    translated_segments[i] = translated_text
+                    if checkpoint is not None:
+                        checkpoint.record(i, translated_text)
+            advance(len(copies[segment]))
+
+        # Os segmentos que outro worker já está a pedir esperam por essa requisição
+        owned = {}
+        waiting = []
+        for segment, indices in copies.items():
+            key = segment_key(segment, source_lang, target_lang)
+            leader, future = self.inflight.claim(key)
+            if leader:
+                owned[indices[0]] = (key, segment)
+            else:
+                waiting.append((segment, future))
+
+        if filtered:
+            self._record_prefilter(segments, filtered, sorted(owned), pack_budget)
+
+        unresolved = {key for key, _ in owned.values()}
+        try:
+            for pack in pack_segments(segments, sorted(owned), PACK_SEPARATOR, pack_budget):
+                # Os erros transitórios já foram repetidos em _get_with_retry; o que
+                # chega aqui é definitivo e aborta o texto em vez de o deixar meio traduzido
+                lines = [segments[i] for i in pack]
+                for i, translated_text in zip(pack, self._translate_pack(lines, source_lang, target_lang)):
+                    key, segment = owned[i]
+                    self.inflight.resolve(key, translated_text)
+                    unresolved.discard(key)
+                    fill(segment, translated_text)
+        except BaseException as e:
+            for key in unresolved:
+                self.inflight.fail(key, e)
+            raise
+
+        for segment, future in waiting:
+            try:
+                translated_text = future.result()
+                COALESCED.inc(len(copies[segment]))
+            except Exception:
+                # A requisição do outro worker falhou: este tenta por conta própria
+                translated_text = self._translate_pack([segment], source_lang, target_lang)[0]
+            fill(segment, translated_text)
+
+        return segmentation.rebuild(translated_segments)
+
+    def _record_prefilter(self, segments, filtered: Dict[str, list], sent: list,
+                          pack_budget: Optional[int]):
+        """Regista o que cada regra do pré-filtro poupou face aos pacotes que saem de facto."""
+        sent_packs = sum(1 for _ in pack_segments(segments, sent, PACK_SEPARATOR, pack_budget))
+        for rule, indices in filtered.items():
+            # Pacotes a mais se só esta regra estivesse desligada
+            packs = sum(1 for _ in pack_segments(segments, sorted(sent + indices), PACK_SEPARATOR, pack_budget))
+            SegmentFilter.record(rule, len(indices), sum(len(segments[i]) for i in indices), packs - sent_packs)
+
+    def translate_with_progress(self, text: str, progress_callback=None,
+                                source_lang: str = 'en', target_lang: str = 'pt',
+                                pack_budget: Optional[int] = DEFAULT_PACK_BUDGET,
+                                checkpoint=None) -> Optional[str]:
+        """
+        Traduz o texto segmento a segmento, reportando o progresso por segmento.
+
+        Args:
+            text: Texto para traduzir
+            progress_callback: Função chamada com a percentagem concluída
+            source_lang: Idioma de origem (padrão: 'en')
+            target_lang: Idioma de destino (padrão: 'pt')
+            pack_budget: Tamanho máximo do parâmetro q codificado por requisição;
+                os segmentos consecutivos são agrupados até este limite. None envia
+                uma requisição por segmento.
+            checkpoint: FileCheckpoint opcional (ver journal.py); os segmentos já
+                registados não são pedidos de novo e cada pacote traduzido é
+                registado à medida que chega.
+
+        Returns:
+            Texto traduzido, com os espaços e as linhas do original
+
+        Raises:
+            requests.RequestException: se uma requisição falhar depois de
+                esgotadas as tentativas
+        """
+        if not text.strip():
+            return ""
+
+        return self._translate_segmented(text, source_lang, target_lang, progress_callback,
+                                         pack_budget, checkpoint)
+
+    def translate_targets(self, text: str, target_langs: Sequence[str], progress_callback=None,
+                          source_lang: str = 'en',
+                          pack_budget: Optional[int] = DEFAULT_PACK_BUDGET) -> Dict[str, str]:
+        """
+        Traduz o texto para vários idiomas de uma só vez.
+
+        O texto é segmentado uma vez e os idiomas são pedidos em paralelo,
+        todos sob o mesmo limitador de taxa e com a mesma memória de tradução.
+
+        Args:
+            text: Texto para traduzir
+            target_langs: Idiomas de destino (por exemplo ['pt', 'es', 'fr'])
+            progress_callback: Função chamada com a percentagem concluída no
+                conjunto dos idiomas (pode ser chamada de várias threads)
+            source_lang: Idioma de origem (padrão: 'en')
+            pack_budget: Como em translate_with_progress
+
+        Returns:
+            Dicionário idioma -> texto traduzido
+
+        Raises:
+            requests.RequestException: se uma requisição falhar depois de
+                esgotadas as tentativas
+        """
+        if not text.strip():
+            return {lang: "" for lang in target_langs}
+
+        import concurrent.futures
+        import threading
+
+        segmentation = segment_text(text, pack_budget or DEFAULT_MAX_ENCODED)
+        total = len(segmentation.segments) * len(target_langs)
+        done = 0
+        lock = threading.Lock()
+
+        def advance(count):
+            nonlocal done
+            with lock:
+                done += count
+                progress = done / total * 100
+            if progress_callback:
+                progress_callback(progress)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(target_langs),
+                                                   thread_name_prefix='targets') as executor:
+            futures = {
+                lang: executor.submit(self._translate_segmentation, segmentation, source_lang, lang,
+                                      advance, pack_budget)
+                for lang in target_langs
+            }
+            return {lang: future.result() for lang, future in futures.items()}
@@ -0,0 +1,78 @@
+import threading
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import requests
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+
+class PooledSession:
+    """
+    Sessão HTTP de longa duração com pool de ligações keep-alive.
+
+    Todas as instâncias de GoogleTranslator partilham por omissão a mesma
+    sessão, pelo que o editor e a tradução em lote reutilizam as ligações
+    TCP/TLS já abertas para translate.googleapis.com. O requests só é
+    importado quando a primeira sessão é criada.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT):
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self._lock = threading.Lock()
+
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+    def get(self, url: str, **kwargs) -> 'requests.Response':
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def stats(self) -> dict:
+        """
+        Devolve os contadores de ligações do pool.
+
+        Returns:
+            requests: requisições enviadas; handshakes: ligações novas abertas
+            (TCP e TLS); reused: requisições servidas por uma ligação já aberta
+        """
+        requests_sent = 0
+        handshakes = 0
+        with self._lock:
+            pools = self._adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_sent += pool.num_requests
+                handshakes += pool.num_connections
+        return {
+            'requests': requests_sent,
+            'handshakes': handshakes,
+            'reused': max(requests_sent - handshakes, 0),
+        }
+
+    def close(self):
+        self.session.close()
+
+
+_shared_session: Optional[PooledSession] = None
+_shared_lock = threading.Lock()
+
+
+def shared_session() -> PooledSession:
+    """Devolve a sessão partilhada pelo processo, criando-a na primeira chamada."""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = PooledSession()
+        return _shared_session
@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+JOURNAL_NAME = '.translation-journal.jsonl'
+
+
+def file_fingerprint(path: str) -> Tuple[int, int]:
+    """Identifica a versão de um ficheiro de origem pelo tamanho e mtime."""
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _settings_key(settings) -> str:
+    return json.dumps(settings or {}, sort_keys=True)
+
+
+def _read_journal(path: str):
+    """
+    Estado de um diário, de todas as settings.
+
+    Returns:
+        (último registo file_done por (ficheiro, settings),
+         (fingerprint, {índice: registo segment}) por (ficheiro, settings) ainda
+         por concluir, último registo window por (ficheiro, settings) ainda por
+         concluir)
+    """
+    completed = {}
+    segments = {}
+    windows = {}
+    if not os.path.exists(path):
+        return completed, segments, windows
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Última linha cortada por uma interrupção
+                continue
+            key = (record.get('file'), _settings_key(record.get('settings')))
+            fingerprint = record.get('fingerprint')
+            if record.get('event') == 'file_done':
+                completed[key] = record
+                segments.pop(key, None)
+                windows.pop(key, None)
+            elif record.get('event') == 'window':
+                windows[key] = record
+            elif record.get('event') == 'segment':
+                saved = segments.get(key)
+                if saved is None or saved[0] != fingerprint:
+                    saved = (fingerprint, {})
+                    segments[key] = saved
+                saved[1][record['index']] = record
+    return completed, segments, windows
+
+
+class FileCheckpoint:
+    """Segmentos já traduzidos de um ficheiro, guardados no diário à medida que chegam."""
+
+    def __init__(self, journal: 'BatchJournal', name: str, fingerprint, segments: Dict[int, str]):
+        self.journal = journal
+        self.name = name
+        self.fingerprint = list(fingerprint)
+        self.segments = segments
+
+    def record(self, index: int, translation: str):
+        self.segments[index] = translation
+        self.journal._append({
+            'event': 'segment',
+            'file': self.name,
+            'fingerprint': self.fingerprint,
+            'settings': self.journal.settings,
+            'index': index,
+            'translation': translation,
+        })
+
+
+class StreamCheckpoint:
+    """
+    Até onde chegou um ficheiro traduzido em streaming: bytes da entrada já
+    traduzidos e bytes da tradução já escritos no ficheiro parcial.
+    """
+
+    def __init__(self, journal: 'BatchJournal', name: str, fingerprint, consumed: int = 0, written: int = 0):
+        self.journal = journal
+        self.name = name
+        self.fingerprint = list(fingerprint)
+        self.consumed = consumed
+        self.written = written
+
+    def record(self, consumed: int, written: int):
+        self.consumed = consumed
+        self.written = written
+        self.journal._append({
+            'event': 'window',
+            'file': self.name,
+            'fingerprint': self.fingerprint,
+            'settings': self.journal.settings,
+            'consumed': consumed,
+            'written': written,
+        })
+
+
+class BatchJournal:
+    """
+    Diário append-only (JSON lines) de um lote, guardado na pasta de saída.
+
+    Regista cada segmento traduzido (cada janela, nos ficheiros em streaming)
+    e cada ficheiro concluído. Ao reiniciar o lote, os ficheiros concluídos
+    cuja origem não mudou são ignorados e os restantes retomam a partir dos
+    segmentos ou da janela já registados. close() compacta
+    o diário, largando os segmentos dos ficheiros já concluídos.
+
+    Cada registo leva as ``settings`` do lote (as mesmas do manifesto: idiomas,
+    motor); registos feitos com outras settings são ignorados, para que um
+    lote para outro idioma na mesma pasta não aproveite o trabalho anterior.
+
+    Args:
+        output_dir: Pasta de saída do lote
+        settings: Configuração da tradução (por exemplo a do manifesto)
+    """
+
+    def __init__(self, output_dir: str, settings: Optional[dict] = None):
+        self.path = os.path.join(output_dir, JOURNAL_NAME)
+        # Normalizado como sai do JSON, para comparar com os registos lidos
+        self.settings = json.loads(json.dumps(settings or {}))
+        self._lock = threading.Lock()
+        self._completed: Dict[str, list] = {}
+        self._segments: Dict[str, Tuple[list, Dict[int, str]]] = {}
+        self._windows: Dict[str, dict] = {}
+
+        os.makedirs(output_dir, exist_ok=True)
+        self._load()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _load(self):
+        settings_key = _settings_key(self.settings)
+        completed, segments, windows = _read_journal(self.path)
+        for (name, key), record in completed.items():
+            if key == settings_key:
+                self._completed[name] = record['fingerprint']
+        for (name, key), (fingerprint, records) in segments.items():
+            if key == settings_key:
+                self._segments[name] = (fingerprint, {index: record['translation']
+                                                      for index, record in records.items()})
+        for (name, key), record in windows.items():
+            if key == settings_key:
+                self._windows[name] = record
+
+    def _append(self, record: dict, sync: bool = False):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def is_done(self, name: str, fingerprint) -> bool:
+        return self._completed.get(name) == list(fingerprint)
+
+    def checkpoint(self, name: str, fingerprint) -> FileCheckpoint:
+        saved = self._segments.get(name)
+        segments = dict(saved[1]) if saved and saved[0] == list(fingerprint) else {}
+        return FileCheckpoint(self, name, fingerprint, segments)
+
+    def stream_checkpoint(self, name: str, fingerprint) -> StreamCheckpoint:
+        saved = self._windows.get(name)
+        if saved and saved['fingerprint'] == list(fingerprint):
+            return StreamCheckpoint(self, name, fingerprint, saved['consumed'], saved['written'])
+        return StreamCheckpoint(self, name, fingerprint)
+
+    def mark_done(self, name: str, fingerprint):
+        self._completed[name] = list(fingerprint)
+        self._segments.pop(name, None)
+        self._windows.pop(name, None)
+        self._append({'event': 'file_done', 'file': name, 'fingerprint': list(fingerprint),
+                      'settings': self.settings}, sync=True)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+            self._compact()
+
+    def _compact(self):
+        """
+        Reescreve o diário só com o que ainda serve: o último ``file_done`` de
+        cada ficheiro e os segmentos (ou a última janela, em streaming) dos
+        ficheiros por concluir. Sem isto o
+        diário cresce uma linha por segmento em cada execução.
+        """
+        completed, segments, windows = _read_journal(self.path)
+        temp_path = f"{self.path}.part"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for record in completed.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            for _, records in segments.values():
+                for record in records.values():
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            for record in windows.values():
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
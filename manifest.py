@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_NAME = '.translation-manifest.json'
+HASH_CHUNK_SIZE = 1024 * 1024
+SAVE_EVERY = 50
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 do ficheiro, lido em blocos para não o carregar todo em memória."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def split_blocks(text: str) -> List[str]:
+    """
+    Divide o texto em blocos: parágrafos (linhas seguidas não vazias) e
+    linhas em branco isoladas. '\\n'.join(blocos) reconstrói o texto exato.
+    """
+    blocks = []
+    paragraph = []
+    for line in text.split('\n'):
+        if line.strip():
+            paragraph.append(line)
+            continue
+        if paragraph:
+            blocks.append('\n'.join(paragraph))
+            paragraph = []
+        blocks.append(line)
+    if paragraph:
+        blocks.append('\n'.join(paragraph))
+    return blocks
+
+
+class TranslationManifest:
+    """
+    Manifesto da pasta de saída para retradução incremental.
+
+    Para cada ficheiro de origem guarda tamanho, mtime, hash do conteúdo, as
+    definições da tradução (idiomas, motor) e, por parágrafo, o hash da
+    origem e o número de linhas que ocupa na saída. Assim um ficheiro alterado
+    só precisa de retraduzir os parágrafos novos; os restantes são copiados
+    da saída anterior.
+    """
+
+    def __init__(self, output_dir: str, settings: Dict[str, str]):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.settings = dict(settings)
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.entries: Dict[str, dict] = {}
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('files', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def check(self, name: str, input_path: str, output_path: str,
+              fingerprint: Optional[Tuple[int, int]] = None) -> Tuple[bool, Optional[dict]]:
+        """
+        Verifica se o ficheiro mudou desde a última tradução.
+
+        ``fingerprint`` (tamanho, mtime_ns), se já for conhecido, evita um novo stat.
+
+        Returns:
+            (inalterado, entrada anterior com as mesmas definições ou None)
+        """
+        entry = self.entries.get(name)
+        if entry is None or entry.get('settings') != self.settings:
+            return False, None
+        if entry.get('output') != output_path or not os.path.exists(output_path):
+            return False, entry
+
+        if fingerprint is None:
+            stat = os.stat(input_path)
+            fingerprint = stat.st_size, stat.st_mtime_ns
+        size, mtime_ns = fingerprint
+        if size != entry['size']:
+            return False, entry
+        if mtime_ns == entry['mtime_ns']:
+            return True, entry
+
+        # O mtime mudou mas o tamanho não: confirma pelo hash do conteúdo
+        if hash_file(input_path) == entry['sha256']:
+            with self._lock:
+                entry['mtime_ns'] = mtime_ns
+                self._dirty += 1
+            return True, entry
+        return False, entry
+
+    def previous_blocks(self, entry: Optional[dict]) -> Dict[str, List[str]]:
+        """Devolve as linhas traduzidas de cada parágrafo da saída anterior, por hash da origem."""
+        if not entry or not entry.get('blocks'):
+            return {}
+        try:
+            with open(entry['output'], 'r', encoding='utf-8') as f:
+                output_lines = f.read().split('\n')
+        except OSError:
+            return {}
+        if len(output_lines) != sum(count for _, count in entry['blocks']):
+            # A saída foi editada à mão; não é seguro reaproveitá-la
+            return {}
+
+        reusable = {}
+        position = 0
+        for block_hash, count in entry['blocks']:
+            reusable.setdefault(block_hash, output_lines[position:position + count])
+            position += count
+        return reusable
+
+    def update(self, name: str, input_path: str, output_path: str,
+               blocks: Optional[List[Tuple[str, int]]]):
+        stat = os.stat(input_path)
+        sha256 = hash_file(input_path)
+        with self._lock:
+            self.entries[name] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': sha256,
+                'settings': self.settings,
+                'output': output_path,
+                'blocks': blocks,
+            }
+            self._dirty += 1
+            if self._dirty >= SAVE_EVERY:
+                self._save_locked()
+
+    def _save_locked(self):
+        temp_path = f"{self.path}.part"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'files': self.entries}, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self._dirty = 0
+
+    def save(self):
+        with self._lock:
+            if self._dirty:
+                self._save_locked()
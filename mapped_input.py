@@ -0,0 +1,224 @@
+"""
+Entrada mapeada em memória (mmap) com um índice compacto de segmentos.
+
+O SegmentIndex guarda, em dois arrays, o offset em bytes e o tamanho de
+cada segmento (a mesma divisão de segmenter.segment_text, exceto nas
+linhas maiores que LONG_LINE_CHUNK, cortadas antes num espaço), cerca de
+12 bytes por segmento em vez de uma str por linha. O índice é construído aos
+poucos, à medida que é consultado, e o texto só é descodificado quando uma
+janela é pedida; a primeira requisição pode sair antes de o ficheiro ter
+sido lido até ao fim. Em streaming (iter_mapped_windows) os segmentos das
+janelas já lidas são largados, e o índice fica limitado à janela corrente.
+"""
+import mmap
+import os
+import re
+from array import array
+from typing import Iterator, Tuple
+
+from segmenter import DEFAULT_MAX_ENCODED, LINE_CONTENT, encoded_size, segment_text
+
+# Conteúdo de uma linha, em bytes; \s só cobre os espaços ASCII
+LINE_BYTES = re.compile(rb'[^\s](?:[^\n]*[^\s])?')
+# Linhas maiores que isto são segmentadas por partes, sem as descodificar inteiras
+LONG_LINE_CHUNK = 256 * 1024
+INDEX_STEP = 4096
+
+
+def _plain_edge(byte: int) -> bool:
+    # Bytes não ASCII ou separadores \x1c-\x1f nas pontas podem ser espaço em Unicode
+    return byte < 0x80 and not 0x1c <= byte <= 0x1f
+
+
+class SegmentIndex:
+    """
+    Segmentos de um ficheiro UTF-8, por offset em bytes, sobre um mmap.
+
+    ``starts[i - first]`` e ``lengths[i - first]`` delimitam o segmento i;
+    tudo o que fica entre segmentos (espaços, quebras de linha) é separador,
+    como em segmenter.Segmentation. ``first`` só passa de 0 quando windows()
+    é chamado com ``release``, que larga os segmentos das janelas já lidas.
+    Use como gestor de contexto para fechar o mmap.
+
+    Args:
+        path: Ficheiro de entrada
+        max_encoded: Limite de cada segmento, como em segment_text
+    """
+
+    def __init__(self, path: str, max_encoded: int = DEFAULT_MAX_ENCODED):
+        self.path = path
+        self.max_encoded = max_encoded
+        self.size = os.path.getsize(path)
+        self._file = open(path, 'rb')
+        # Um ficheiro vazio não pode ser mapeado
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b''
+        self.starts = array('Q')
+        self.lengths = array('I')
+        # Índice do segmento em starts[0]
+        self.first = 0
+        self.complete = False
+        self._lines = LINE_BYTES.finditer(self._map)
+
+    def close(self):
+        # O iterador de linhas prende o buffer do mmap, que não fecharia
+        self._lines = iter(())
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        while self._extend():
+            pass
+        return self.first + len(self.starts)
+
+    # Construção do índice
+
+    def _add(self, start: int, end: int):
+        self.starts.append(start)
+        self.lengths.append(end - start)
+
+    def _add_text(self, offset: int, text: str):
+        """Indexa os segmentos de ``text``, descodificado a partir do byte ``offset``."""
+        segmentation = segment_text(text, self.max_encoded)
+        position = offset + len(segmentation.prefix.encode('utf-8'))
+        for segment, separator in zip(segmentation.segments, segmentation.separators):
+            size = len(segment.encode('utf-8'))
+            self._add(position, position + size)
+            position += size + len(separator.encode('utf-8'))
+
+    def _add_long_line(self, start: int, end: int):
+        # Segmenta a linha em partes cortadas num espaço, sem a descodificar inteira
+        position = start
+        while position < end:
+            chunk_end = min(end, position + LONG_LINE_CHUNK)
+            if chunk_end < end:
+                space = max(self._map.rfind(b' ', position, chunk_end), self._map.rfind(b'\t', position, chunk_end))
+                if space > position:
+                    chunk_end = space
+                while self._map[chunk_end] & 0xC0 == 0x80:
+                    chunk_end -= 1
+            self._add_text(position, self._map[position:chunk_end].decode('utf-8'))
+            position = chunk_end
+
+    def _extend(self, lines: int = INDEX_STEP) -> bool:
+        """Indexa mais ``lines`` linhas; False quando o ficheiro já está todo indexado."""
+        if self.complete:
+            return False
+        for _ in range(lines):
+            match = next(self._lines, None)
+            if match is None:
+                self.complete = True
+                return False
+            start, end = match.span()
+            if not (_plain_edge(self._map[start]) and _plain_edge(self._map[end - 1])):
+                # Pode haver espaço Unicode nas pontas: usa a mesma expressão do segmenter
+                line = self._map[start:end].decode('utf-8')
+                content = LINE_CONTENT.search(line)
+                if content is None:
+                    continue
+                start += len(line[:content.start()].encode('utf-8'))
+                end = start + len(content.group().encode('utf-8'))
+            if (end - start) * 3 <= self.max_encoded:
+                # Cada byte ocupa no máximo 3 caracteres depois de codificado na URL
+                self._add(start, end)
+            elif end - start > LONG_LINE_CHUNK:
+                self._add_long_line(start, end)
+            else:
+                line = self._map[start:end].decode('utf-8')
+                if encoded_size(line) <= self.max_encoded:
+                    self._add(start, end)
+                else:
+                    self._add_text(start, line)
+        return True
+
+    def _ensure(self, index: int) -> bool:
+        """Garante que o segmento ``index`` está indexado; False se não existe."""
+        while self.first + len(self.starts) <= index:
+            if not self._extend():
+                return self.first + len(self.starts) > index
+        return True
+
+    def _release(self, index: int):
+        """Larga os segmentos anteriores a ``index``; deixam de poder ser consultados."""
+        count = index - self.first
+        if count > 0:
+            del self.starts[:count]
+            del self.lengths[:count]
+            self.first = index
+
+    # Consulta
+
+    def segment(self, index: int) -> str:
+        """Texto do segmento ``index``, descodificado só agora."""
+        if index < self.first or not self._ensure(index):
+            raise IndexError(index)
+        start = self.starts[index - self.first]
+        return self._map[start:start + self.lengths[index - self.first]].decode('utf-8')
+
+    def text(self, start: int, end: int) -> str:
+        """Bytes ``start..end`` como texto, com '\\r\\n' normalizado para '\\n' (como na leitura em modo texto)."""
+        return self._map[start:end].decode('utf-8').replace('\r\n', '\n')
+
+    def _next_start(self, index: int) -> int:
+        return self.starts[index + 1 - self.first] if self._ensure(index + 1) else self.size
+
+    def windows(self, window_bytes: int, release: bool = False) -> Iterator[Tuple[str, int]]:
+        """
+        Janelas de segmentos completos com cerca de ``window_bytes``, cada uma
+        com os separadores que a seguem; a concatenação é o texto inteiro.
+
+        As janelas terminam de preferência no fim de uma linha; uma linha
+        maior que o dobro da janela é cortada entre dois dos seus segmentos.
+        Com ``release`` os segmentos de cada janela são largados do índice
+        quando ela é devolvida, e a memória do índice deixa de crescer com o
+        ficheiro; segment() só serve então para os segmentos ainda por ler.
+
+        Yields:
+            (texto da janela, bytes do ficheiro até ao fim da janela)
+        """
+        if not self._ensure(0):
+            if self.size:
+                yield self.text(0, self.size), self.size
+            return
+
+        window_start = 0
+        index = self.first
+        while True:
+            end = self.starts[index - self.first] + self.lengths[index - self.first]
+            following = self._next_start(index)
+            if following >= self.size:
+                yield self.text(window_start, self.size), self.size
+                return
+            size = end - window_start
+            line_end = self._map.find(b'\n', end, following) >= 0
+            if (size >= window_bytes and line_end) or size >= 2 * window_bytes:
+                yield self.text(window_start, following), following
+                window_start = following
+                if release:
+                    self._release(index + 1)
+            index += 1
+
+    def memory_usage(self) -> int:
+        """Bytes ocupados pelo índice (sem contar o mmap, que é do sistema)."""
+        return self.starts.itemsize * len(self.starts) + self.lengths.itemsize * len(self.lengths)
+
+
+def iter_mapped_windows(path: str, window_chars: int,
+                        max_encoded: int = DEFAULT_MAX_ENCODED) -> Iterator[Tuple[str, int]]:
+    """
+    Lê o ficheiro em janelas de cerca de ``window_chars`` bytes, sobre um mmap
+    e um SegmentIndex construído durante a leitura (ver SegmentIndex.windows).
+    Os segmentos de cada janela lida são largados do índice, por isso a
+    memória não cresce com o tamanho do ficheiro.
+
+    Yields:
+        (texto da janela, bytes do ficheiro até ao fim da janela)
+    """
+    with SegmentIndex(path, max_encoded) as index:
+        yield from index.windows(window_chars, release=True)
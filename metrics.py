@@ -0,0 +1,166 @@
+import json
+import threading
+from typing import Dict, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key) -> str:
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in key) + '}'
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            if list(self._values) in ([], [()]):
+                return self._values.get((), 0)
+            return {_format_labels(key) or 'total': value for key, value in self._values.items()}
+
+    def prometheus(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._sum += value
+            self._count += 1
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    return
+            self._counts[-1] += 1
+
+    def quantile(self, fraction: float) -> float:
+        """Estimativa do quantil pelo limite superior do bucket."""
+        with self._lock:
+            if not self._count:
+                return 0.0
+            target = fraction * self._count
+            seen = 0
+            for bound, count in zip(self.buckets + (float('inf'),), self._counts):
+                seen += count
+                if seen >= target:
+                    return bound
+        return float('inf')
+
+    def snapshot(self):
+        with self._lock:
+            count, total = self._count, self._sum
+        return {
+            'count': count,
+            'sum': round(total, 6),
+            'mean': round(total / count, 6) if count else 0.0,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+        }
+
+    def prometheus(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            cumulative = 0
+            for bound, count in zip(self.buckets, self._counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{le="+Inf"}} {self._count}')
+            lines.append(f"{self.name}_sum {self._sum}")
+            lines.append(f"{self.name}_count {self._count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Contadores e histogramas do processo.
+
+    snapshot() devolve um dicionário com os valores atuais; to_prometheus() e
+    to_json() servem para despejar as métricas no fim de um lote.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, help_text, *args)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str = '') -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def histogram(self, name: str, help_text: str = '', buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.snapshot() for metric in metrics}
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.prometheus())
+        return '\n'.join(lines) + '\n'
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def dump(self, path: str):
+        """Grava as métricas; ficheiros .prom/.txt em formato Prometheus, os restantes em JSON."""
+        text = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+
+METRICS = MetricsRegistry()
+
+REQUESTS = METRICS.counter('translator_requests_total', "Requisições HTTP ao endpoint de tradução")
+BYTES_SENT = METRICS.counter('translator_request_bytes_sent_total', "Bytes enviados (URL das requisições)")
+BYTES_RECEIVED = METRICS.counter('translator_response_bytes_received_total', "Bytes recebidos nas respostas")
+REQUEST_LATENCY = METRICS.histogram('translator_request_latency_seconds', "Latência de cada requisição HTTP")
+RETRIES = METRICS.counter('translator_retries_total', "Tentativas repetidas após erros transitórios")
+CACHE_HITS = METRICS.counter('translator_cache_hits_total', "Segmentos servidos pela memória de tradução")
+CACHE_MISSES = METRICS.counter('translator_cache_misses_total', "Segmentos não encontrados na memória de tradução")
+SEGMENTS_PER_REQUEST = METRICS.histogram('translator_segments_per_request', "Segmentos enviados por requisição",
+                                         SIZE_BUCKETS)
+FILE_SECONDS = METRICS.histogram('translator_file_processing_seconds', "Tempo de processamento por ficheiro")
+FILES = METRICS.counter('translator_files_total', "Ficheiros processados por estado")
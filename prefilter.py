@@ -0,0 +1,284 @@
+"""
+Pré-filtro local: segmentos que não precisam de tradução passam intactos.
+
+Números, datas e horas numéricas, URLs, código e linhas que já estão no
+idioma de destino não são enviados ao serviço. A identificação do idioma é
+feita offline, por palavras frequentes (línguas de escrita latina) ou pelo
+sistema de escrita (japonês, coreano, grego, ...), e só decide quando a
+evidência é clara; na dúvida o segmento é traduzido.
+"""
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import metrics
+
+RULE_NUMBERS = 'numeros'
+RULE_TIMESTAMPS = 'datas'
+RULE_URLS = 'urls'
+RULE_CODE = 'codigo'
+RULE_TARGET_LANGUAGE = 'idioma-destino'
+DEFAULT_RULES = (RULE_TIMESTAMPS, RULE_NUMBERS, RULE_URLS, RULE_CODE, RULE_TARGET_LANGUAGE)
+
+PREFILTER_SEGMENTS = metrics.METRICS.counter('translator_prefilter_segments_total',
+                                             "Segmentos não enviados por regra do pré-filtro")
+PREFILTER_CHARS = metrics.METRICS.counter('translator_prefilter_chars_total',
+                                          "Caracteres não enviados por regra do pré-filtro")
+PREFILTER_REQUESTS = metrics.METRICS.counter('translator_prefilter_requests_saved_total',
+                                             "Requisições poupadas por cada regra do pré-filtro")
+
+# Datas e horas só com dígitos, como nos logs: 2024-03-01, 01/03/2024, 10:15:30,123,
+# 2024-03-01T10:15:30Z, 2024-03-01 10:15:30 +0000. Datas com nomes de meses ou dias
+# ("Monday, March 3, 2024") são texto e seguem para tradução
+_DATE = r'\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}'
+_TIME = r'\d{1,2}:\d{2}(?::\d{2})?(?:[.,]\d+)?'
+_ZONE = r'(?:z|utc|gmt|[+-]\d{2}:?\d{2})'
+TIMESTAMP_CORE = re.compile(_DATE + '|' + _TIME)
+TIMESTAMP_TOKEN = re.compile(
+    r'(?<!\w)(?:' + _DATE + r'(?:[T ]' + _TIME + r')?' + _ZONE + r'?'
+    r'|' + _TIME + _ZONE + r'?|\d{1,4}|' + _ZONE + r')(?!\w)',
+    re.IGNORECASE,
+)
+TIMESTAMP_FILLER = re.compile(r'[\s,;|()\[\]-]+')
+URL_TOKEN = re.compile(
+    r'(?:[a-z][a-z0-9+.-]*://|www\.)\S+'
+    r'|[\w.+-]+@[\w-]+(?:\.[\w-]+)+'
+    r'|(?:[a-z]:|~|\.{1,2})?[\\/](?:[\w.-]+[\\/]?)+'
+    r'|[\w.-]+(?:[\\/][\w.-]+){2,}[\\/]?'
+    r'|[\w-]+(?:\.[\w-]+)*\.(?:com|org|net|io|dev|gov|edu|br|pt|es|fr|de|uk)(?:[/:]\S*)?',
+    re.IGNORECASE,
+)
+CODE_FENCE = re.compile(r'^(```|~~~)')
+CODE_LINE = re.compile(
+    r'^(?:import (?=[\w.]*\.\w|\w+,|\w+ as \w)[\w.]*\w(?:\.\*)?(?: as \w+)?(?:, [\w.]*\w)*;?$'
+    r'|from [\w.]+ import [\w., ()*]+$|def \w+\('
+    r'|class \w+(?:\([\w., =]*\))?:$|class \w+(?:\s+(?:extends|implements)\s+[\w.<>, ]+)*\s*\{'
+    r'|#include\s*[<"]|#define \w+|#!/|function\s*\w*\s*\(|(?:var|let|const) \w+\s*=|\w+(?:\.\w+)*\(.*\);$'
+    r'|(?:public|private|protected|static)\s.*[({;]$'
+    r'|return\b(?!.*\b(?!new\b)[a-zA-Z]+ [a-zA-Z]+\b).*;$)'
+)
+# SQL só conta sem palavras frequentes em minúsculas ("SELECT your items FROM the list")
+SQL_LINE = re.compile(r'^(?:SELECT|INSERT|UPDATE|DELETE)\b.*\b(?:FROM|INTO|SET|WHERE)\b')
+CODE_SYMBOLS = frozenset('{}[];=<>$&|\\*_#@`^~')
+CODE_ENDINGS = (';', '{', '}', '(', '[')
+# Também terminam frases comuns: só contam com muito mais símbolos
+WEAK_CODE_ENDINGS = (')', ',')
+WORD = re.compile(r'[^\W\d_]+')
+
+# Palavras frequentes e curtas de cada língua. Muitas existem em várias (a, as, no,
+# do, de); is_language ignora as da língua de origem e desiste se a linha tiver alguma
+STOPWORDS = {
+    'en': {'the', 'and', 'of', 'to', 'is', 'in', 'that', 'it', 'for', 'was', 'with', 'on', 'are', 'be', 'this',
+           'have', 'you', 'not', 'but', 'they', 'at', 'from', 'by', 'or', 'an', 'which', 'we', 'will', 'can',
+           'has', 'there', 'their', 'were', 'been', 'would', 'what', 'if', 'when', 'all', 'your', 'my',
+           'a', 'i', 'as', 'do', 'no', 'so', 'me', 'he', 'she', 'his', 'her', 'had', 'one', 'just'},
+    'pt': {'o', 'a', 'os', 'as', 'de', 'do', 'da', 'dos', 'das', 'em', 'no', 'na', 'nos', 'nas', 'que', 'não',
+           'um', 'uma', 'com', 'para', 'por', 'é', 'são', 'mas', 'ao', 'pelo', 'pela', 'isso', 'este', 'esta',
+           'você', 'também', 'muito', 'já', 'foi', 'se', 'mais', 'como', 'ou', 'seu', 'sua', 'ele', 'ela', 'e'},
+    'es': {'el', 'la', 'los', 'las', 'de', 'del', 'al', 'y', 'en', 'que', 'no', 'un', 'una', 'con', 'para',
+           'por', 'es', 'son', 'pero', 'está', 'también', 'muy', 'ya', 'fue', 'su', 'sus', 'lo', 'se', 'más',
+           'como', 'o', 'este', 'esta', 'usted', 'él', 'ella', 'hay', 'cuando', 'porque'},
+    'fr': {'le', 'la', 'les', 'de', 'des', 'du', 'un', 'une', 'et', 'en', 'est', 'que', 'qui', 'pas', 'ne',
+           'pour', 'dans', 'sur', 'avec', 'ce', 'cette', 'il', 'elle', 'nous', 'vous', 'ils', 'sont', 'mais',
+           'au', 'aux', 'par', 'plus', 'se', 'ou', 'son', 'sa', 'ses', 'été', 'être', 'je'},
+    'de': {'der', 'die', 'das', 'und', 'ist', 'nicht', 'ein', 'eine', 'zu', 'den', 'dem', 'des', 'mit', 'von',
+           'sich', 'auf', 'für', 'im', 'es', 'sie', 'er', 'wir', 'ich', 'auch', 'aber', 'wie', 'wird', 'sind',
+           'bei', 'oder', 'noch', 'nach', 'aus', 'wenn', 'dass', 'kann', 'hat', 'nur'},
+    'it': {'il', 'lo', 'la', 'gli', 'le', 'di', 'del', 'della', 'dei', 'e', 'è', 'che', 'non', 'un', 'una',
+           'per', 'con', 'su', 'da', 'in', 'sono', 'ma', 'come', 'più', 'anche', 'questo', 'questa', 'si',
+           'ha', 'nel', 'nella', 'al', 'alla', 'io', 'lui', 'lei', 'noi', 'voi', 'perché', 'quando'},
+    'nl': {'de', 'het', 'een', 'en', 'van', 'is', 'dat', 'niet', 'op', 'te', 'in', 'met', 'voor', 'zijn',
+           'er', 'die', 'aan', 'ook', 'als', 'maar', 'bij', 'om', 'naar', 'dan', 'nog', 'wel', 'wordt', 'door',
+           'ik', 'je', 'we', 'ze', 'hij', 'zij', 'kan', 'heeft', 'uit', 'worden', 'deze', 'dit'},
+}
+MIN_WORDS = 3
+MIN_STOPWORD_SHARE = 0.25
+
+# Sistema de escrita -> línguas que o usam (as que o usam sozinhas identificam-se logo)
+SCRIPT_LANGUAGES = {
+    'HANGUL': ('ko',),
+    'HIRAGANA': ('ja',),
+    'KATAKANA': ('ja',),
+    'CJK': ('zh', 'zh-CN', 'zh-TW', 'ja'),
+    'GREEK': ('el',),
+    'HEBREW': ('he', 'iw', 'yi'),
+    'THAI': ('th',),
+    'CYRILLIC': ('ru', 'uk', 'bg', 'sr', 'mk', 'be', 'kk'),
+    'ARABIC': ('ar', 'fa', 'ur'),
+    'DEVANAGARI': ('hi', 'mr', 'ne'),
+}
+
+
+def _script(char: str) -> str:
+    name = unicodedata.name(char, '')
+    if name.startswith('CJK'):
+        return 'CJK'
+    return name.split(' ', 1)[0]
+
+
+def dominant_script(text: str) -> Optional[str]:
+    """Sistema de escrita da maioria das letras ('LATIN', 'CYRILLIC', 'CJK', ...)."""
+    counts: Dict[str, int] = {}
+    for char in text:
+        if char.isalpha():
+            script = _script(char)
+            counts[script] = counts.get(script, 0) + 1
+    if not counts:
+        return None
+    return max(counts, key=counts.get)
+
+
+def detect_language(text: str, ignore: Iterable[str] = ()) -> Optional[str]:
+    """
+    Identifica o idioma de um texto curto sem rede; None se não houver certeza.
+
+    As línguas de escrita latina são reconhecidas pelas palavras frequentes
+    (STOPWORDS), contadas uma vez cada e sem as de ``ignore``, exigindo pelo
+    menos MIN_WORDS palavras, uma parte mínima de palavras frequentes
+    diferentes e o dobro dos acertos da segunda língua. As
+    outras são reconhecidas pelo sistema de escrita quando este só é usado
+    por uma língua (o japonês pelos kana, o chinês por Han sem kana).
+    """
+    script = dominant_script(text)
+    if script is None:
+        return None
+    if script in ('HIRAGANA', 'KATAKANA'):
+        return 'ja'
+    if script == 'CJK':
+        return 'ja' if any(_script(char) in ('HIRAGANA', 'KATAKANA') for char in text) else 'zh'
+    if script != 'LATIN':
+        languages = SCRIPT_LANGUAGES.get(script, ())
+        return languages[0] if len(languages) == 1 else None
+
+    words = WORD.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+    distinct = set(words)
+    counted = distinct.difference(ignore)
+    scores = sorted(((len(counted & stopwords), lang) for lang, stopwords in STOPWORDS.items()), reverse=True)
+    (best, lang), (second, _) = scores[0], scores[1]
+    if best < 2 or best < MIN_STOPWORD_SHARE * len(distinct) or best < 2 * second:
+        return None
+    return lang
+
+
+def _base_language(lang: str) -> str:
+    return lang.split('-')[0].lower()
+
+
+def is_language(text: str, lang: str, source_lang: str = 'auto') -> bool:
+    """True se ``text`` está com certeza em ``lang`` (e não em ``source_lang``)."""
+    target = _base_language(lang)
+    if target == _base_language(source_lang):
+        return False
+    script = dominant_script(text)
+    languages = [_base_language(item) for item in SCRIPT_LANGUAGES.get(script, ())]
+    if len(set(languages)) > 1 and script != 'CJK':
+        # Escritas partilhadas (cirílico, árabe, ...): a escrita não distingue, por
+        # exemplo, ucraniano de russo; na dúvida traduz
+        return False
+    source_words = STOPWORDS.get(_base_language(source_lang))
+    if source_words is None:
+        # Origem desconhecida: só contam as palavras exclusivas do destino
+        source_words = set().union(*(words for lang, words in STOPWORDS.items() if lang != target))
+    elif source_words.intersection(WORD.findall(text.lower())):
+        # Qualquer palavra frequente da origem deixa dúvida: traduz
+        return False
+    detected = detect_language(text, ignore=source_words)
+    return detected is not None and _base_language(detected) == target
+
+
+def _only_timestamps(segment: str) -> bool:
+    if not TIMESTAMP_CORE.search(segment):
+        return False
+    rest = TIMESTAMP_FILLER.sub('', TIMESTAMP_TOKEN.sub('', segment))
+    return not any(char.isalnum() for char in rest)
+
+
+def _only_urls(segment: str) -> bool:
+    found = False
+    for token in segment.split():
+        if URL_TOKEN.fullmatch(token.strip('.,;:!?()[]<>"\'')):
+            found = True
+        elif any(char.isalpha() for char in token):
+            return False
+    return found
+
+
+def _looks_like_code(segment: str) -> bool:
+    if CODE_LINE.match(segment):
+        return True
+    if SQL_LINE.match(segment):
+        return not any(len(word) > 1 and any(word in words for words in STOPWORDS.values())
+                       for word in WORD.findall(segment) if word.islower())
+    # Linhas curtas de pontuação já ficam na regra dos números
+    if len(segment) < 6:
+        return False
+    symbols = sum(1 for char in segment if char in CODE_SYMBOLS) / len(segment)
+    if segment.endswith(CODE_ENDINGS):
+        return symbols >= 0.15
+    return segment.endswith(WEAK_CODE_ENDINGS) and symbols >= 0.35
+
+
+class SegmentFilter:
+    """
+    Classifica os segmentos de uma Segmentation antes de irem para tradução.
+
+    Args:
+        rules: Regras ativas, pela ordem em que são testadas (DEFAULT_RULES)
+    """
+
+    def __init__(self, rules: Sequence[str] = DEFAULT_RULES):
+        unknown = set(rules) - set(DEFAULT_RULES)
+        if unknown:
+            raise ValueError(f"regras desconhecidas: {', '.join(sorted(unknown))}")
+        self.rules = tuple(rules)
+
+    def classify_one(self, segment: str, source_lang: str, target_lang: str) -> Optional[str]:
+        """Regra que deixa ``segment`` passar sem tradução, ou None."""
+        for rule in self.rules:
+            if rule == RULE_TIMESTAMPS and _only_timestamps(segment):
+                return rule
+            if rule == RULE_NUMBERS and not any(char.isalpha() for char in segment):
+                return rule
+            if rule == RULE_URLS and _only_urls(segment):
+                return rule
+            if rule == RULE_CODE and _looks_like_code(segment):
+                return rule
+            if rule == RULE_TARGET_LANGUAGE and is_language(segment, target_lang, source_lang):
+                return rule
+        return None
+
+    def classify(self, segments: Sequence[str], source_lang: str, target_lang: str) -> List[Optional[str]]:
+        """
+        Regra de cada segmento (None = traduzir). As linhas entre cercas
+        ``` ou ~~~ (blocos de código em Markdown) contam como código.
+        """
+        rules: List[Optional[str]] = []
+        fence = None
+        for segment in segments:
+            if RULE_CODE in self.rules:
+                match = CODE_FENCE.match(segment)
+                if fence is not None or match:
+                    if fence is None:
+                        fence = match.group(1)
+                    elif segment.startswith(fence):
+                        fence = None
+                    rules.append(RULE_CODE)
+                    continue
+            rules.append(self.classify_one(segment, source_lang, target_lang))
+        return rules
+
+    @staticmethod
+    def record(rule: str, segments: int, chars: int, requests: int):
+        PREFILTER_SEGMENTS.inc(segments, rule=rule)
+        PREFILTER_CHARS.inc(chars, rule=rule)
+        PREFILTER_REQUESTS.inc(requests, rule=rule)
+
+    @staticmethod
+    def stats() -> Dict[str, dict]:
+        """Segmentos, caracteres e requisições poupados por regra desde o início do processo."""
+        return {rule: {'segments': int(PREFILTER_SEGMENTS.value(rule=rule)),
+                       'chars': int(PREFILTER_CHARS.value(rule=rule)),
+                       'requests': int(PREFILTER_REQUESTS.value(rule=rule))}
+                for rule in DEFAULT_RULES if PREFILTER_SEGMENTS.value(rule=rule)}
@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Optional
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket com taxa adaptativa (aumento aditivo, redução multiplicativa).
+
+    Cada requisição consome um token. Enquanto as requisições têm sucesso a
+    taxa de reposição sobe ``increase`` req/s; uma resposta 429/503 divide a
+    taxa por ``1 / decrease_factor`` e esvazia o balde.
+    """
+
+    def __init__(self, initial_rate: float = 2.0, min_rate: float = 0.2, max_rate: float = 20.0,
+                 increase: float = 0.2, decrease_factor: float = 0.5, burst: float = 2.0):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.capacity = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Bloqueia até haver um token disponível e consome-o."""
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_throttle(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = 0.0
+
+    def record_status(self, status_code: int):
+        if status_code in THROTTLE_STATUS_CODES:
+            self.record_throttle()
+        elif status_code < 400:
+            self.record_success()
+
+    def describe(self) -> str:
+        return f"{self.rate:.1f} req/s"
+
+
+_shared_limiter: Optional[AdaptiveRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def shared_limiter() -> AdaptiveRateLimiter:
+    """Devolve o limitador partilhado por todos os caminhos de tradução."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter()
+        return _shared_limiter
@@ -0,0 +1,131 @@
+import email.utils
+import random
+import threading
+import time
+from typing import Optional
+
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+class RetryPolicy:
+    """Backoff exponencial com jitter completo para erros transitórios."""
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 30.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Tempo de espera antes da tentativa ``attempt + 1``.
+
+        O Retry-After do servidor, quando existe, é respeitado como mínimo.
+        """
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        if retry_after is not None:
+            return max(retry_after, backoff)
+        return backoff
+
+
+class CircuitBreaker:
+    """
+    Disjuntor partilhado por todos os workers.
+
+    Depois de ``failure_threshold`` falhas seguidas o circuito abre e todas
+    as chamadas a wait() ficam bloqueadas durante ``reset_timeout`` segundos.
+    Depois disso passa uma única requisição de teste: se tiver sucesso o
+    circuito fecha, se falhar volta a abrir.
+    """
+
+    CLOSED = 'fechado'
+    OPEN = 'aberto'
+    HALF_OPEN = 'semiaberto'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.times_opened = 0
+        self._open_until = 0.0
+        self._cond = threading.Condition()
+
+    def wait(self):
+        """Bloqueia enquanto o circuito estiver aberto ou à espera do resultado do teste."""
+        with self._cond:
+            while True:
+                if self.state == self.CLOSED:
+                    return
+                if self.state == self.OPEN:
+                    remaining = self._open_until - time.monotonic()
+                    if remaining <= 0:
+                        self.state = self.HALF_OPEN
+                        return
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+
+    def accepting(self) -> bool:
+        """
+        True se uma requisição passaria já em wait(): circuito fechado, ou
+        aberto mas com o tempo de espera esgotado (a próxima é o teste).
+        """
+        with self._cond:
+            if self.state == self.OPEN:
+                return self._open_until <= time.monotonic()
+            return self.state == self.CLOSED
+
+    def _open(self, seconds: float):
+        self.state = self.OPEN
+        self._open_until = max(self._open_until, time.monotonic() + seconds)
+        self.failures = 0
+        self.times_opened += 1
+        self._cond.notify_all()
+
+    def record_success(self):
+        with self._cond:
+            if self.state != self.OPEN:
+                self.state = self.CLOSED
+            self.failures = 0
+            self._cond.notify_all()
+
+    def record_failure(self):
+        with self._cond:
+            if self.state == self.HALF_OPEN:
+                self._open(self.reset_timeout)
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._open(self.reset_timeout)
+
+    def pause(self, seconds: float):
+        """Suspende todos os workers (por exemplo, a pedido de um Retry-After)."""
+        with self._cond:
+            self._open(seconds)
+
+
+_shared_breaker: Optional[CircuitBreaker] = None
+_shared_lock = threading.Lock()
+
+
+def shared_breaker() -> CircuitBreaker:
+    """Devolve o disjuntor partilhado por todos os caminhos de tradução."""
+    global _shared_breaker
+    with _shared_lock:
+        if _shared_breaker is None:
+            _shared_breaker = CircuitBreaker()
+        return _shared_breaker
@@ -0,0 +1,132 @@
+import re
+import urllib.parse
+from typing import Iterable, Iterator, List, Optional
+
+DEFAULT_MAX_ENCODED = 4000
+
+# Conteúdo de uma linha sem os espaços das pontas
+LINE_CONTENT = re.compile(r'[^\s](?:[^\n]*[^\s])?')
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…。！？])(\s+)')
+WORD_BOUNDARY = re.compile(r'(\s+)')
+
+
+def encoded_size(text: str) -> int:
+    """Tamanho do texto depois de codificado no parâmetro q da URL."""
+    return len(urllib.parse.quote_plus(text))
+
+
+class Segmentation:
+    """
+    Resultado da segmentação: ``prefix + segs[0] + seps[0] + segs[1] + seps[1] ...``
+    reconstrói o texto original exatamente.
+
+    Os segmentos nunca contêm quebras de linha nem espaços nas pontas; todo o
+    espaço em branco (incluindo linhas vazias e indentação) fica nos
+    separadores, que não são enviados para tradução.
+    """
+
+    def __init__(self, prefix: str, segments: List[str], separators: List[str]):
+        self.prefix = prefix
+        self.segments = segments
+        self.separators = separators
+
+    def __len__(self):
+        return len(self.segments)
+
+    def rebuild(self, translations: Iterable[str]) -> str:
+        parts = [self.prefix]
+        for translated, separator in zip(translations, self.separators):
+            parts.append(translated)
+            parts.append(separator)
+        return ''.join(parts)
+
+
+def _split_to_fit(text: str, boundary: re.Pattern, max_encoded: int) -> Iterator[tuple]:
+    """Divide ``text`` nas fronteiras dadas, juntando partes enquanto couberem no limite."""
+    parts = boundary.split(text)
+    current = parts[0]
+    for i in range(1, len(parts), 2):
+        separator, following = parts[i], parts[i + 1]
+        if encoded_size(current + separator + following) <= max_encoded:
+            current += separator + following
+        else:
+            yield current, separator
+            current = following
+    yield current, ''
+
+
+def _hard_split(text: str, max_encoded: int) -> Iterator[str]:
+    piece = ''
+    size = 0
+    for char in text:
+        char_size = encoded_size(char)
+        if piece and size + char_size > max_encoded:
+            yield piece
+            piece, size = '', 0
+        piece += char
+        size += char_size
+    if piece:
+        yield piece
+
+
+def _split_line(line: str, max_encoded: int) -> Iterator[tuple]:
+    """Divide uma linha longa em frases, depois palavras e, em último caso, caracteres."""
+    for sentence, sentence_sep in _split_to_fit(line, SENTENCE_BOUNDARY, max_encoded):
+        if encoded_size(sentence) <= max_encoded:
+            yield sentence, sentence_sep
+            continue
+        words = list(_split_to_fit(sentence, WORD_BOUNDARY, max_encoded))
+        for w, (word, word_sep) in enumerate(words):
+            last_sep = sentence_sep if w == len(words) - 1 else word_sep
+            if encoded_size(word) <= max_encoded:
+                yield word, last_sep
+                continue
+            chunks = list(_hard_split(word, max_encoded))
+            for c, chunk in enumerate(chunks):
+                yield chunk, last_sep if c == len(chunks) - 1 else ''
+
+
+def segment_text(text: str, max_encoded: int = DEFAULT_MAX_ENCODED) -> Segmentation:
+    """
+    Segmenta o texto por linhas e, nas linhas maiores que ``max_encoded``,
+    por frases, de forma a que cada segmento caiba numa requisição.
+    """
+    segments = []
+    separators = []
+    matches = list(LINE_CONTENT.finditer(text))
+    prefix = text[:matches[0].start()] if matches else text
+
+    for m, match in enumerate(matches):
+        end = matches[m + 1].start() if m + 1 < len(matches) else len(text)
+        trailing = text[match.end():end]
+        line = match.group()
+        if encoded_size(line) <= max_encoded:
+            segments.append(line)
+            separators.append(trailing)
+            continue
+        pieces = list(_split_line(line, max_encoded))
+        for p, (piece, separator) in enumerate(pieces):
+            segments.append(piece)
+            separators.append(trailing if p == len(pieces) - 1 else separator)
+
+    return Segmentation(prefix, segments, separators)
+
+
+def pack_segments(segments: List[str], indices: Iterable[int], separator: str,
+                  max_encoded: Optional[int] = DEFAULT_MAX_ENCODED) -> Iterator[List[int]]:
+    """
+    Agrupa segmentos consecutivos (pelos índices dados) em pacotes cujo
+    parâmetro q codificado, unido por ``separator``, cabe em ``max_encoded``.
+    Com ``max_encoded=None`` cada segmento vai sozinho.
+    """
+    separator_size = encoded_size(separator)
+    pack, size = [], 0
+    for index in indices:
+        cost = encoded_size(segments[index]) + separator_size
+        if pack and (max_encoded is None or size + cost > max_encoded):
+            yield pack
+            pack, size = [], 0
+        pack.append(index)
+        size += cost
+    if pack:
+        yield pack
@@ -0,0 +1,154 @@
+import os
+from typing import Callable, Dict, Iterator, Optional, TextIO, Tuple
+
+from mapped_input import iter_mapped_windows
+
+DEFAULT_WINDOW_CHARS = 64 * 1024
+# Ficheiros acima deste tamanho são traduzidos em streaming nos lotes
+DEFAULT_STREAM_THRESHOLD = 8 * 1024 * 1024
+
+
+def iter_text_windows(stream: TextIO, window_chars: int = DEFAULT_WINDOW_CHARS) -> Iterator[Tuple[str, int]]:
+    """
+    Lê um fluxo de texto já aberto (por exemplo sys.stdin) em janelas de
+    linhas completas com cerca de ``window_chars``; os ficheiros usam
+    mapped_input.iter_mapped_windows.
+
+    Cada janela inclui as suas quebras de linha, pelo que a concatenação das
+    janelas é o texto original.
+
+    Yields:
+        (texto da janela, caracteres lidos até ao fim da janela)
+    """
+    window = []
+    size = 0
+    consumed = 0
+    for line in stream:
+        consumed += len(line)
+        window.append(line)
+        size += len(line)
+        if size >= window_chars:
+            yield ''.join(window), consumed
+            window = []
+            size = 0
+    if window:
+        yield ''.join(window), consumed
+
+
+def _translate_window(translate_text: Callable[[str, Callable[[float], None]], Optional[str]],
+                      window: str, start: int, end: int, total_bytes: int,
+                      progress_callback: Optional[Callable[[float], None]]) -> str:
+    """Traduz a janela que ocupa os bytes ``start..end`` da entrada, reportando o progresso no ficheiro."""
+    if not window.strip():
+        translated = window
+    else:
+        def window_progress(progress):
+            if progress_callback and total_bytes:
+                progress_callback((start + (end - start) * progress / 100) / total_bytes * 100)
+
+        translated = translate_text(window, window_progress)
+        if translated is None:
+            raise ValueError("tradução vazia")
+    if progress_callback and total_bytes:
+        progress_callback(end / total_bytes * 100)
+    return translated
+
+
+def translate_windows(translate_text: Callable[[str, Callable[[float], None]], Optional[str]],
+                      windows: Iterator[Tuple[str, int]],
+                      total_bytes: int,
+                      progress_callback: Optional[Callable[[float], None]] = None) -> Iterator[str]:
+    """Traduz cada janela à medida que é lida, devolvendo o texto traduzido janela a janela."""
+    previous = 0
+    for window, consumed in windows:
+        yield _translate_window(translate_text, window, previous, consumed, total_bytes, progress_callback)
+        previous = consumed
+
+
+def translate_file_streaming(translate_text: Callable[[str, Callable[[float], None]], Optional[str]],
+                             input_path: str, output_path: str,
+                             progress_callback: Optional[Callable[[float], None]] = None,
+                             window_chars: int = DEFAULT_WINDOW_CHARS, checkpoint=None) -> int:
+    """
+    Traduz um ficheiro de qualquer tamanho com memória constante.
+
+    A entrada é mapeada em memória e lida em janelas (mapped_input), cada
+    janela é traduzida logo que chega e o resultado é acrescentado à saída; no
+    fim o ficheiro parcial substitui o destino. ``translate_text`` tem de
+    preservar as linhas (por exemplo GoogleTranslator.translate_with_progress).
+
+    Args:
+        checkpoint: StreamCheckpoint opcional (ver journal.py); cada janela
+            escrita é registada nele e, se o ficheiro parcial de uma execução
+            anterior ainda lá estiver, a tradução continua a partir da última
+            janela registada em vez de recomeçar do byte 0
+
+    Returns:
+        Número de caracteres escritos nesta execução
+    """
+    total_bytes = os.path.getsize(input_path)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    temp_path = f"{output_path}.part"
+    resume = 0
+    if checkpoint is not None and checkpoint.consumed and os.path.exists(temp_path) \
+            and os.path.getsize(temp_path) >= checkpoint.written:
+        # As janelas dependem só do conteúdo, que o fingerprint garante ser o mesmo
+        with open(temp_path, 'r+b') as out:
+            out.truncate(checkpoint.written)
+        resume = checkpoint.consumed
+
+    written = 0
+    with open(temp_path, 'a' if resume else 'w', encoding='utf-8') as out:
+        previous = 0
+        for window, consumed in iter_mapped_windows(input_path, window_chars):
+            if consumed > resume:
+                translated = _translate_window(translate_text, window, previous, consumed, total_bytes,
+                                               progress_callback)
+                out.write(translated)
+                written += len(translated)
+                if checkpoint is not None:
+                    out.flush()
+                    checkpoint.record(consumed, out.tell())
+            previous = consumed
+    os.replace(temp_path, output_path)
+    return written
+
+
+def translate_file_streaming_targets(translate_targets: Callable[[str, Callable[[float], None]], Dict[str, str]],
+                                     input_path: str, output_paths: Dict[str, str],
+                                     progress_callback: Optional[Callable[[float], None]] = None,
+                                     window_chars: int = DEFAULT_WINDOW_CHARS):
+    """
+    Como translate_file_streaming, mas cada janela é lida uma vez e traduzida
+    para todos os idiomas de ``output_paths`` (idioma -> caminho de saída).
+
+    ``translate_targets(janela, progresso)`` devolve um dicionário idioma -> tradução.
+    """
+    total_bytes = os.path.getsize(input_path)
+    outputs = {}
+    try:
+        for lang, output_path in output_paths.items():
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            outputs[lang] = open(f"{output_path}.part", 'w', encoding='utf-8')
+
+        previous = 0
+        for window, consumed in iter_mapped_windows(input_path, window_chars):
+            if not window.strip():
+                translations = dict.fromkeys(outputs, window)
+            else:
+                def window_progress(progress, start=previous, end=consumed):
+                    if progress_callback and total_bytes:
+                        progress_callback((start + (end - start) * progress / 100) / total_bytes * 100)
+
+                translations = translate_targets(window, window_progress)
+            for lang, out in outputs.items():
+                if not translations.get(lang):
+                    raise ValueError(f"tradução vazia ({lang})")
+                out.write(translations[lang])
+            previous = consumed
+    finally:
+        for out in outputs.values():
+            out.close()
+
+    for lang, output_path in output_paths.items():
+        os.replace(f"{output_path}.part", output_path)
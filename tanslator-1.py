@@ -1,50 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import requests
-import urllib.parse
-import time
-import json
-import os
-from typing import Optional
-
-class GoogleTranslator:
-    def __init__(self):
-        self.base_url = "https://translate.googleapis.com/translate_a/single"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-
-    def translate(self, text: str, source_lang: str = 'en', target_lang: str = 'pt') -> Optional[str]:
-        try:
-            params = {
-                'client': 'gtx',
-                'sl': source_lang,
-                'tl': target_lang,
-                'dt': 't',
-                'q': text
-            }
-            
-            encoded_params = urllib.parse.urlencode(params)
-            url = f"{self.base_url}?{encoded_params}"
-            
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            
-            result = response.json()
-            if result and isinstance(result[0], list):
-                translated_text = ''
-                for item in result[0]:
-                    if item[0]:
-                        translated_text += item[0]
-                return translated_text
-            
-            return None
-            
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro na tradução: {str(e)}")
-            return None
+
+from google_translator import GoogleTranslator
+from tk_jobs import TkJobRunner
 
 class TranslatorApp:
     def __init__(self, root):
@@ -52,6 +10,7 @@ class TranslatorApp:
         self.root.title("Tradutor de Textos")
         self.root.geometry("800x600")
         self.translator = GoogleTranslator()
+        self.jobs = TkJobRunner(self.root)
         self.current_file = None
         
         self.setup_ui()
@@ -163,11 +122,22 @@ class TranslatorApp:
     def translate_text(self):
         text = self.text_area.get(1.0, tk.END).strip()
         if text:
-            translated = self.translator.translate(text)
-            if translated:
-                self.text_area.delete(1.0, tk.END)
-                self.text_area.insert(1.0, translated)
-                messagebox.showinfo("Sucesso", "Texto traduzido com sucesso!")
+            if self.jobs.busy:
+                messagebox.showwarning("Aviso", "Já existe uma tradução em curso.")
+                return
+
+            def done(translated):
+                if translated:
+                    self.text_area.delete(1.0, tk.END)
+                    self.text_area.insert(1.0, translated)
+                    messagebox.showinfo("Sucesso", "Texto traduzido com sucesso!")
+
+            def failed(error):
+                messagebox.showerror("Erro", f"Erro na tradução: {error}")
+
+            # A requisição corre em segundo plano para não bloquear a janela
+            self.jobs.submit(lambda progress: self.translator.translate_strict(text),
+                             on_done=done, on_error=failed)
         else:
             messagebox.showwarning("Aviso", "Por favor, insira algum texto para traduzir.")
 
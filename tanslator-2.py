@@ -1,53 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import requests
-import urllib.parse
-import time
-import json
 import os
-from typing import Optional
-
-class GoogleTranslator:
-    def __init__(self):
-        self.base_url = "https://translate.googleapis.com/translate_a/single"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-
-    def translate(self, text: str, source_lang: str = 'en', target_lang: str = 'pt') -> Optional[str]:
-        try:
-            if not text.strip():
-                return ""
-                
-            params = {
-                'client': 'gtx',
-                'sl': source_lang,
-                'tl': target_lang,
-                'dt': 't',
-                'q': text
-            }
-            
-            encoded_params = urllib.parse.urlencode(params)
-            url = f"{self.base_url}?{encoded_params}"
-            
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            
-            result = response.json()
-            if result and isinstance(result[0], list):
-                translated_text = ''
-                for item in result[0]:
-                    if item[0]:
-                        translated_text += item[0]
-                return translated_text
-            
-            return None
-            
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro na tradução: {str(e)}")
-            return None
+
+from file_list_view import VirtualFileList
+from file_scanner import mirror_path, scan_files
+from google_translator import GoogleTranslator
+from tk_jobs import TkJobRunner
 
 class TranslatorApp:
     def __init__(self, root):
@@ -55,6 +13,7 @@ class TranslatorApp:
         self.root.title("Tradutor de Ficheiros")
         self.root.geometry("800x600")
         self.translator = GoogleTranslator()
+        self.jobs = TkJobRunner(self.root)
         self.current_file = None
         self.setup_ui()
 
@@ -76,8 +35,8 @@ class TranslatorApp:
 
         # Lista de arquivos
         ttk.Label(main_frame, text="Arquivos para traduzir:").grid(row=2, column=0, sticky=tk.W)
-        self.file_listbox = tk.Listbox(main_frame, width=70, height=15)
-        self.file_listbox.grid(row=3, column=0, columnspan=3, pady=5)
+        self.file_list = VirtualFileList(main_frame, height=15)
+        self.file_list.grid(row=3, column=0, columnspan=3, pady=5, sticky=(tk.W, tk.E))
 
         # Barra de progresso
         self.progress_var = tk.DoubleVar()
@@ -118,50 +77,44 @@ class TranslatorApp:
             self.output_path.insert(0, folder)
 
     def update_file_list(self):
-        self.file_listbox.delete(0, tk.END)
         input_folder = self.input_path.get()
-        if os.path.exists(input_folder):
-            files = [f for f in os.listdir(input_folder) if f.endswith('.txt')]
-            for file in files:
-                self.file_listbox.insert(tk.END, file)
+        if not os.path.exists(input_folder):
+            self.file_list.load([])
+            return
+
+        # Inclui as subpastas; a listagem corre em segundo plano e a lista só
+        # desenha as linhas visíveis, mesmo com centenas de milhares de ficheiros
+        self.jobs.submit(lambda progress: list(scan_files(input_folder)), on_done=self.file_list.load)
 
     def select_all_files(self):
-        self.file_listbox.select_set(0, tk.END)
+        self.file_list.select_all()
 
     def clear_selection(self):
-        self.file_listbox.selection_clear(0, tk.END)
-
-    def translate_file(self, input_file: str, output_file: str) -> bool:
-        try:
-            with open(input_file, 'r', encoding='utf-8') as f:
-                text = f.read()
-
-            translated_text = self.translator.translate(text)
-            if translated_text:
-                os.makedirs(os.path.dirname(output_file), exist_ok=True)
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(translated_text)
-                return True
-            return False
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro ao processar arquivo {input_file}: {str(e)}")
-            return False
+        self.file_list.clear_selection()
 
     def translate_selected_files(self):
-        selected_indices = self.file_listbox.curselection()
-        if not selected_indices:
+        files = self.file_list.selected_names()
+        if not files:
             messagebox.showwarning("Aviso", "Por favor, selecione alguns arquivos para traduzir.")
             return
-        self.translate_files([self.file_listbox.get(idx) for idx in selected_indices])
+        self.translate_files(files)
 
     def translate_all_files(self):
-        files = list(self.file_listbox.get(0, tk.END))
+        files = self.file_list.visible_names()
         if not files:
             messagebox.showwarning("Aviso", "Nenhum arquivo encontrado na pasta de entrada.")
             return
         self.translate_files(files)
 
     def translate_files(self, files):
+        # O motor de lotes só é carregado quando é preciso
+        from batch import BatchTranslator, STATUS_ERROR
+        from manifest import TranslationManifest
+
+        if self.jobs.busy:
+            messagebox.showwarning("Aviso", "Já existe uma tradução em curso.")
+            return
+
         input_folder = self.input_path.get()
         output_folder = self.output_path.get()
 
@@ -170,23 +123,41 @@ class TranslatorApp:
             return
 
         total_files = len(files)
-        successful = 0
         self.progress_var.set(0)
-
-        for i, file in enumerate(files, 1):
-            self.status_label.config(text=f"Traduzindo: {file}")
-            input_file = os.path.join(input_folder, file)
-            output_file = os.path.join(output_folder, file)
-
-            if self.translate_file(input_file, output_file):
-                successful += 1
-
-            self.progress_var.set((i / total_files) * 100)
-            self.root.update()
-            time.sleep(1)  # Delay para evitar bloqueio da API
-
-        self.status_label.config(text=f"Concluído! {successful}/{total_files} arquivos traduzidos com sucesso.")
-        messagebox.showinfo("Concluído", f"Tradução finalizada!\n{successful}/{total_files} arquivos traduzidos com sucesso.")
+        # A saída repete a estrutura de subpastas da entrada
+        jobs = [(file, mirror_path(input_folder, file), mirror_path(output_folder, file)) for file in files]
+
+        def update_progress(file, file_progress, total_progress, done, total):
+            if file_progress < 100:
+                self.file_list.set_status(file, f"{file_progress:.0f}%")
+            self.status_label.config(
+                text=f"Traduzindo: {file} ({done}/{total}, {self.translator.limiter.describe()})"
+            )
+            self.progress_var.set(total_progress)
+
+        def finished(results):
+            successful = sum(1 for result in results if result.ok)
+            for result in results:
+                self.file_list.set_status(result.name, result.status)
+
+            failed = [result for result in results if result.status == STATUS_ERROR]
+            if failed:
+                details = "\n".join(f"{result.name}: {result.error}" for result in failed[:10])
+                messagebox.showerror("Erro", f"Erro ao processar {len(failed)} arquivo(s):\n{details}")
+
+            self.status_label.config(text=f"Concluído! {successful}/{total_files} arquivos traduzidos com sucesso.")
+            messagebox.showinfo("Concluído", f"Tradução finalizada!\n{successful}/{total_files} arquivos traduzidos com sucesso.")
+
+        def crashed(error):
+            self.status_label.config(text="Erro durante a tradução")
+            messagebox.showerror("Erro", f"Erro durante a tradução: {error}")
+
+        # O lote corre em segundo plano; o progresso volta ao Tk pela fila do TkJobRunner
+        # O manifesto na pasta de saída evita retraduzir ficheiros que não mudaram
+        manifest = TranslationManifest(output_folder, {'source_lang': 'en', 'target_lang': 'pt', 'engine': 'gtx'})
+        batch = BatchTranslator(self.translator.translate_with_progress, manifest=manifest)
+        self.jobs.submit(lambda progress: batch.run(jobs, progress),
+                         on_progress=update_progress, on_done=finished, on_error=crashed)
 
 def main():
     root = tk.Tk()
@@ -1,53 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, Menu
-import requests
-import urllib.parse
-import time
-import json
 import os
-from typing import Optional
-
-class GoogleTranslator:
-    def __init__(self):
-        self.base_url = "https://translate.googleapis.com/translate_a/single"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-        }
-
-    def translate(self, text: str, source_lang: str = 'en', target_lang: str = 'pt') -> Optional[str]:
-        try:
-            if not text.strip():
-                return ""
-                
-            params = {
-                'client': 'gtx',
-                'sl': source_lang,
-                'tl': target_lang,
-                'dt': 't',
-                'q': text
-            }
-            
-            encoded_params = urllib.parse.urlencode(params)
-            url = f"{self.base_url}?{encoded_params}"
-            
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            
-            result = response.json()
-            if result and isinstance(result[0], list):
-                translated_text = ''
-                for item in result[0]:
-                    if item[0]:
-                        translated_text += item[0]
-                return translated_text
-            
-            return None
-            
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro na tradução: {str(e)}")
-            return None
+
+from editor_pane import SideBySideEditor
+from file_list_view import VirtualFileList
+from file_scanner import mirror_path, scan_files
+from google_translator import GoogleTranslator
+from tk_jobs import TkJobRunner
 
 class TranslatorApp:
     def __init__(self, root):
@@ -55,6 +14,7 @@ class TranslatorApp:
         self.root.title("Tradutor de Ficheiros")
         self.root.geometry("1000x700")
         self.translator = GoogleTranslator()
+        self.jobs = TkJobRunner(self.root)
         self.current_file = None
         self.setup_menu()
         self.setup_ui()
@@ -70,6 +30,7 @@ class TranslatorApp:
         file_menu.add_command(label="Abrir", command=self.open_file)
         file_menu.add_command(label="Guardar", command=self.save_file)
         file_menu.add_command(label="Guardar Como", command=self.save_as_file)
+        file_menu.add_command(label="Guardar Tradução Como", command=self.save_translation_as)
         file_menu.add_separator()
         file_menu.add_command(label="Sair", command=self.root.quit)
 
@@ -99,16 +60,11 @@ class TranslatorApp:
         self.edit_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.edit_frame, text='Editor')
 
-        # Área de texto com barra de rolagem
-        text_frame = ttk.Frame(self.edit_frame)
-        text_frame.pack(expand=True, fill='both', padx=5, pady=5)
-
-        self.text_area = tk.Text(text_frame, wrap=tk.WORD, undo=True)
-        scrollbar = ttk.Scrollbar(text_frame, orient='vertical', command=self.text_area.yview)
-        self.text_area.configure(yscrollcommand=scrollbar.set)
-
-        self.text_area.pack(side='left', expand=True, fill='both')
-        scrollbar.pack(side='right', fill='y')
+        # Original e tradução lado a lado; só os parágrafos alterados são retraduzidos
+        self.editor = SideBySideEditor(self.edit_frame, self.jobs, self.translator.translate_strict,
+                                       on_live_status=lambda text: self.status_bar.config(text=text), undo=True)
+        self.editor.pack(expand=True, fill='both', padx=5, pady=5)
+        self.text_area = self.editor.source
 
         # Frame de botões do editor
         button_frame = ttk.Frame(self.edit_frame)
@@ -116,6 +72,9 @@ class TranslatorApp:
 
         ttk.Button(button_frame, text="Traduzir", command=self.translate_current_text).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Guardar", command=self.save_file).pack(side='left', padx=5)
+        # Traduz enquanto se escreve, começando pelo parágrafo do cursor
+        ttk.Checkbutton(button_frame, text="Tradução automática",
+                        variable=self.editor.live).pack(side='left', padx=5)
 
         # Aba de tradução em lote
         self.batch_frame = ttk.Frame(self.notebook)
@@ -148,8 +107,8 @@ class TranslatorApp:
 
         # Lista de arquivos
         ttk.Label(main_frame, text="Arquivos para traduzir:").pack(anchor='w', pady=(10, 5))
-        self.file_listbox = tk.Listbox(main_frame, selectmode=tk.MULTIPLE)
-        self.file_listbox.pack(expand=True, fill='both')
+        self.file_list = VirtualFileList(main_frame, selectmode='multiple')
+        self.file_list.pack(expand=True, fill='both')
 
         # Barra de progresso
         self.progress_var = tk.DoubleVar()
@@ -212,14 +171,41 @@ class TranslatorApp:
             self.current_file = file_path
             self.save_file()
 
+    def save_translation_as(self):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Arquivos de texto", "*.txt"), ("Todos os arquivos", "*.*")]
+        )
+        if file_path:
+            try:
+                with open(file_path, 'w', encoding='utf-8') as file:
+                    file.write(self.editor.translated_text())
+                self.status_bar.config(text=f"Tradução salva: {file_path}")
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao salvar arquivo: {str(e)}")
+
     def translate_current_text(self):
         text = self.text_area.get(1.0, tk.END).strip()
         if text:
-            translated = self.translator.translate(text)
-            if translated:
-                self.text_area.delete(1.0, tk.END)
-                self.text_area.insert(1.0, translated)
-                self.status_bar.config(text="Texto traduzido com sucesso")
+            if self.jobs.busy:
+                messagebox.showwarning("Aviso", "Já existe uma tradução em curso.")
+                return
+
+            def progress(percent):
+                self.status_bar.config(text=f"Traduzindo parágrafos alterados... {percent:.0f}%")
+
+            def done(applied):
+                self.status_bar.config(text=f"Texto traduzido com sucesso ({applied} parágrafo(s))")
+
+            def failed(error):
+                self.status_bar.config(text="Erro na tradução")
+                messagebox.showerror("Erro", f"Erro na tradução: {error}")
+
+            # Só os parágrafos alterados desde a última tradução são enviados
+            if self.editor.translate_pending(on_progress=progress, on_done=done, on_error=failed):
+                self.status_bar.config(text="Traduzindo...")
+            else:
+                self.status_bar.config(text="A tradução já está atualizada")
         else:
             messagebox.showwarning("Aviso", "Por favor, insira algum texto para traduzir.")
 
@@ -237,22 +223,33 @@ class TranslatorApp:
             self.output_path.insert(0, folder)
 
     def update_file_list(self):
-        self.file_listbox.delete(0, tk.END)
         input_folder = self.input_path.get()
-        if os.path.exists(input_folder):
-            files = [f for f in os.listdir(input_folder) if f.endswith('.txt')]
-            for file in files:
-                self.file_listbox.insert(tk.END, file)
+        if not os.path.exists(input_folder):
+            self.file_list.load([])
+            return
+
+        # Inclui as subpastas; a listagem corre em segundo plano e a lista só
+        # desenha as linhas visíveis, mesmo com centenas de milhares de ficheiros
+        self.jobs.submit(lambda progress: list(scan_files(input_folder)), on_done=self.file_list.load)
 
     def select_all_files(self):
-        self.file_listbox.select_set(0, tk.END)
+        self.file_list.select_all()
 
     def clear_selection(self):
-        self.file_listbox.selection_clear(0, tk.END)
+        self.file_list.clear_selection()
 
     def translate_selected_files(self):
-        selected_indices = self.file_listbox.curselection()
-        if not selected_indices:
+        # O motor de lotes só é carregado quando é preciso
+        from batch import BatchTranslator, STATUS_ERROR
+        from journal import BatchJournal
+        from manifest import TranslationManifest
+
+        if self.jobs.busy:
+            messagebox.showwarning("Aviso", "Já existe uma tradução em curso.")
+            return
+
+        files = self.file_list.selected_names()
+        if not files:
             messagebox.showwarning("Aviso", "Por favor, selecione alguns arquivos para traduzir.")
             return
         
@@ -263,37 +260,46 @@ class TranslatorApp:
             messagebox.showwarning("Aviso", "Por favor, selecione as pastas de entrada e saída.")
             return
 
-        total_files = len(selected_indices)
-        successful = 0
+        total_files = len(files)
         self.progress_var.set(0)
-
-        for i, idx in enumerate(selected_indices, 1):
-            file = self.file_listbox.get(idx)
-            self.status_bar.config(text=f"Traduzindo: {file}")
-            
-            input_file = os.path.join(input_folder, file)
-            output_file = os.path.join(output_folder, file)
-
-            try:
-                with open(input_file, 'r', encoding='utf-8') as f:
-                    text = f.read()
-
-                translated_text = self.translator.translate(text)
-                if translated_text:
-                    os.makedirs(os.path.dirname(output_file), exist_ok=True)
-                    with open(output_file, 'w', encoding='utf-8') as f:
-                        f.write(translated_text)
-                    successful += 1
-
-            except Exception as e:
-                messagebox.showerror("Erro", f"Erro ao processar arquivo {file}: {str(e)}")
-
-            self.progress_var.set((i / total_files) * 100)
-            self.root.update()
-            time.sleep(1)  # Delay para evitar bloqueio da API
-
-        self.status_bar.config(text=f"Concluído! {successful}/{total_files} arquivos traduzidos com sucesso.")
-        messagebox.showinfo("Concluído", f"Tradução finalizada!\n{successful}/{total_files} arquivos traduzidos com sucesso.")
+        # A saída repete a estrutura de subpastas da entrada
+        jobs = [(file, mirror_path(input_folder, file), mirror_path(output_folder, file)) for file in files]
+
+        def update_progress(file, file_progress, total_progress, done, total):
+            if file_progress < 100:
+                self.file_list.set_status(file, f"{file_progress:.0f}%")
+            self.status_bar.config(
+                text=f"Traduzindo: {file} ({done}/{total}, {self.translator.limiter.describe()})"
+            )
+            self.progress_var.set(total_progress)
+
+        def finished(results):
+            journal.close()
+            successful = sum(1 for result in results if result.ok)
+            for result in results:
+                self.file_list.set_status(result.name, result.status)
+
+            failed = [result for result in results if result.status == STATUS_ERROR]
+            if failed:
+                details = "\n".join(f"{result.name}: {result.error}" for result in failed[:10])
+                messagebox.showerror("Erro", f"Erro ao processar {len(failed)} arquivo(s):\n{details}")
+
+            self.status_bar.config(text=f"Concluído! {successful}/{total_files} arquivos traduzidos com sucesso.")
+            messagebox.showinfo("Concluído", f"Tradução finalizada!\n{successful}/{total_files} arquivos traduzidos com sucesso.")
+
+        def crashed(error):
+            journal.close()
+            self.status_bar.config(text="Erro durante a tradução")
+            messagebox.showerror("Erro", f"Erro durante a tradução: {error}")
+
+        # O lote corre em segundo plano; o progresso volta ao Tk pela fila do TkJobRunner
+        # Os ficheiros já concluídos numa execução anterior ficam registados no diário
+        settings = {'source_lang': 'en', 'target_lang': 'pt', 'engine': 'gtx'}
+        journal = BatchJournal(output_folder, settings)
+        manifest = TranslationManifest(output_folder, settings)
+        batch = BatchTranslator(self.translator.translate_with_progress, journal=journal, manifest=manifest)
+        self.jobs.submit(lambda progress: batch.run(jobs, progress),
+                         on_progress=update_progress, on_done=finished, on_error=crashed)
 
 def main():
     root = tk.Tk()
@@ -1,11 +1,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, Menu
-import requests
-import urllib.parse
-import time
-import json
-import os
-from typing import Optional
+import itertools
+
+from editor_pane import SideBySideEditor
+from file_scanner import scan_jobs
+from google_translator import GoogleTranslator
+from tk_jobs import TkJobRunner
 
 class ProgressDialog:
     def __init__(self, parent):
@@ -67,81 +67,25 @@ class ProgressDialog:
         self.total_percent = ttk.Label(total_progress_frame, text="0%", width=6)
         self.total_percent.pack(side='left', padx=(5, 0))
 
-    def update(self, file_name, progress, total_progress):
+    def update(self, file_name, progress, total_progress, files_done=None, files_total=None):
         self.file_label.config(text=f"Traduzindo: {file_name}")
+        if files_total is not None:
+            self.total_label.config(text=f"Progresso Total: {files_done}/{files_total} ficheiros")
         self.progress_var.set(progress)
         self.percent_label.config(text=f"{progress:.1f}%")
         self.total_var.set(total_progress)
         self.total_percent.config(text=f"{total_progress:.1f}%")
-        self.window.update()
 
     def close(self):
         self.window.destroy()
 
-class GoogleTranslator:
-    def __init__(self):
-        self.base_url = "https://translate.googleapis.com/translate_a/single"
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        }
-
-    def translate_with_progress(self, text: str, progress_callback=None) -> Optional[str]:
-        if not text.strip():
-            return ""
-
-        # Dividir o texto em chunks para mostrar progresso
-        chunks = text.split('\n')
-        total_chunks = len(chunks)
-        translated_chunks = []
-
-        for i, chunk in enumerate(chunks, 1):
-            if not chunk.strip():
-                translated_chunks.append('')
-                continue
-
-            try:
-                params = {
-                    'client': 'gtx',
-                    'sl': 'en',
-                    'tl': 'pt',
-                    'dt': 't',
-                    'q': chunk
-                }
-                
-                encoded_params = urllib.parse.urlencode(params)
-                url = f"{self.base_url}?{encoded_params}"
-                
-                response = requests.get(url, headers=self.headers)
-                response.raise_for_status()
-                
-                result = response.json()
-                if result and isinstance(result[0], list):
-                    translated_text = ''
-                    for item in result[0]:
-                        if item[0]:
-                            translated_text += item[0]
-                    translated_chunks.append(translated_text)
-                else:
-                    translated_chunks.append(chunk)
-
-                if progress_callback:
-                    progress = (i / total_chunks) * 100
-                    progress_callback(progress)
-
-                time.sleep(0.5)  # Delay para evitar bloqueio
-
-            except Exception as e:
-                print(f"Erro ao traduzir chunk: {e}")
-                translated_chunks.append(chunk)
-
-        return '\n'.join(translated_chunks)
-
 class TranslatorApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Tradutor de Ficheiros")
         self.root.geometry("1000x700")
         self.translator = GoogleTranslator()
+        self.jobs = TkJobRunner(self.root)
         self.current_file = None
         self.setup_menu()
         self.setup_ui()
@@ -157,6 +101,7 @@ class TranslatorApp:
         file_menu.add_command(label="Abrir", command=self.open_file)
         file_menu.add_command(label="Guardar", command=self.save_file)
         file_menu.add_command(label="Guardar Como", command=self.save_as_file)
+        file_menu.add_command(label="Guardar Tradução Como", command=self.save_translation_as)
         file_menu.add_separator()
         file_menu.add_command(label="Sair", command=self.root.quit)
 
@@ -179,16 +124,11 @@ class TranslatorApp:
         main_frame = ttk.Frame(self.root, padding="10")
         main_frame.pack(expand=True, fill='both')
 
-        # Área de texto
-        text_frame = ttk.Frame(main_frame)
-        text_frame.pack(expand=True, fill='both', pady=5)
-
-        self.text_area = tk.Text(text_frame, wrap=tk.WORD)
-        scrollbar = ttk.Scrollbar(text_frame, orient='vertical', command=self.text_area.yview)
-        self.text_area.configure(yscrollcommand=scrollbar.set)
-
-        self.text_area.pack(side='left', expand=True, fill='both')
-        scrollbar.pack(side='right', fill='y')
+        # Original e tradução lado a lado; só os parágrafos alterados são retraduzidos
+        self.editor = SideBySideEditor(main_frame, self.jobs, self.translator.translate_strict,
+                                       on_live_status=lambda text: self.status_var.set(text))
+        self.editor.pack(expand=True, fill='both', pady=5)
+        self.text_area = self.editor.source
 
         # Frame de botões
         button_frame = ttk.Frame(main_frame)
@@ -197,6 +137,9 @@ class TranslatorApp:
         ttk.Button(button_frame, text="Traduzir", command=self.translate_current_text).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Traduzir Ficheiros", command=self.translate_batch).pack(side='left', padx=5)
         ttk.Button(button_frame, text="Guardar", command=self.save_file).pack(side='left', padx=5)
+        # Traduz enquanto se escreve, começando pelo parágrafo do cursor
+        ttk.Checkbutton(button_frame, text="Tradução automática",
+                        variable=self.editor.live).pack(side='left', padx=5)
 
         # Barra de status
         self.status_var = tk.StringVar(value="Pronto")
@@ -204,6 +147,12 @@ class TranslatorApp:
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
     def translate_batch(self):
+        # O motor de lotes só é carregado quando é preciso
+        from batch import BatchTranslator, STATUS_ERROR
+        from journal import BatchJournal
+        from manifest import TranslationManifest
+        from streaming import DEFAULT_STREAM_THRESHOLD
+
         input_dir = filedialog.askdirectory(title="Selecione a pasta com os ficheiros para traduzir")
         if not input_dir:
             return
@@ -212,45 +161,49 @@ class TranslatorApp:
         if not output_dir:
             return
 
-        # Listar arquivos .txt
-        files = [f for f in os.listdir(input_dir) if f.endswith('.txt')]
-        if not files:
+        # Listar arquivos .txt, incluindo subpastas; a listagem continua enquanto
+        # os primeiros ficheiros já estão a ser traduzidos
+        jobs = scan_jobs(input_dir, output_dir)
+        first = next(jobs, None)
+        if first is None:
             messagebox.showwarning("Aviso", "Nenhum arquivo .txt encontrado na pasta!")
             return
+        jobs = itertools.chain([first], jobs)
 
         # Criar diálogo de progresso
         progress_dialog = ProgressDialog(self.root)
-        total_files = len(files)
 
-        try:
-            for i, file_name in enumerate(files, 1):
-                input_path = os.path.join(input_dir, file_name)
-                output_path = os.path.join(output_dir, file_name)
+        def update_progress(file_name, file_progress, total_progress, done, total):
+            self.status_var.set(f"Traduzindo: {file_name} ({self.translator.limiter.describe()})")
+            progress_dialog.update(file_name, file_progress, total_progress, done, total)
 
-                # Ler arquivo
-                with open(input_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                # Traduzir com progresso
-                def update_progress(file_progress):
-                    total_progress = ((i - 1) + (file_progress / 100)) / total_files * 100
-                    progress_dialog.update(file_name, file_progress, total_progress)
-
-                translated_text = self.translator.translate_with_progress(content, update_progress)
-
-                # Salvar tradução
-                if translated_text:
-                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                    with open(output_path, 'w', encoding='utf-8') as f:
-                        f.write(translated_text)
+        def finished(results):
+            progress_dialog.close()
+            journal.close()
+            successful = sum(1 for result in results if result.ok)
 
-            messagebox.showinfo("Sucesso", f"Tradução concluída!\n{total_files} arquivos traduzidos com sucesso.")
+            failed = [result for result in results if result.status == STATUS_ERROR]
+            if failed:
+                details = "\n".join(f"{result.name}: {result.error}" for result in failed[:10])
+                messagebox.showerror("Erro", f"Erro ao processar {len(failed)} ficheiro(s):\n{details}")
 
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro durante a tradução: {str(e)}")
+            self.status_var.set("Tradução concluída!")
+            messagebox.showinfo("Sucesso", f"Tradução concluída!\n{successful}/{len(results)} arquivos traduzidos com sucesso.")
 
-        finally:
+        def crashed(error):
             progress_dialog.close()
+            journal.close()
+            messagebox.showerror("Erro", f"Erro durante a tradução: {str(error)}")
+
+        # Traduzir vários ficheiros em paralelo, fora da thread do Tk; o diário na
+        # pasta de saída permite retomar o lote se for interrompido
+        settings = {'source_lang': 'en', 'target_lang': 'pt', 'engine': 'gtx-linhas'}
+        journal = BatchJournal(output_dir, settings)
+        manifest = TranslationManifest(output_dir, settings)
+        batch = BatchTranslator(self.translator.translate_with_progress, journal=journal, manifest=manifest,
+                                stream_above=DEFAULT_STREAM_THRESHOLD)
+        self.jobs.submit(lambda progress: batch.run(jobs, progress),
+                         on_progress=update_progress, on_done=finished, on_error=crashed)
 
     def translate_current_text(self):
         text = self.text_area.get(1.0, tk.END).strip()
@@ -258,25 +211,26 @@ class TranslatorApp:
             messagebox.showwarning("Aviso", "Por favor, insira algum texto para traduzir.")
             return
 
+        if not self.editor.has_pending():
+            self.status_var.set("A tradução já está atualizada")
+            return
+
         progress_dialog = ProgressDialog(self.root)
-        
-        try:
-            def update_progress(progress):
-                progress_dialog.update("Texto atual", progress, progress)
-
-            translated = self.translator.translate_with_progress(text, update_progress)
-            
-            if translated:
-                self.text_area.delete(1.0, tk.END)
-                self.text_area.insert(1.0, translated)
-                self.status_var.set("Tradução concluída!")
-                messagebox.showinfo("Sucesso", "Texto traduzido com sucesso!")
-
-        except Exception as e:
-            messagebox.showerror("Erro", f"Erro durante a tradução: {str(e)}")
-
-        finally:
+
+        def update_progress(progress):
+            self.status_var.set(f"Traduzindo parágrafos alterados ({self.translator.limiter.describe()})")
+            progress_dialog.update("Parágrafos alterados", progress, progress)
+
+        def finished(applied):
             progress_dialog.close()
+            self.status_var.set(f"Tradução concluída! ({applied} parágrafo(s))")
+
+        def crashed(error):
+            progress_dialog.close()
+            messagebox.showerror("Erro", f"Erro durante a tradução: {str(error)}")
+
+        # Só os parágrafos alterados são traduzidos; o painel da direita é corrigido à medida que chegam
+        self.editor.translate_pending(on_progress=update_progress, on_done=finished, on_error=crashed)
 
     # [Outros métodos permanecem os mesmos...]
     def new_file(self):
@@ -310,6 +264,19 @@ class TranslatorApp:
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao salvar arquivo: {str(e)}")
 
+    def save_translation_as(self):
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".txt",
+            filetypes=[("Arquivos de texto", "*.txt"), ("Todos os arquivos", "*.*")]
+        )
+        if file_path:
+            try:
+                with open(file_path, 'w', encoding='utf-8') as file:
+                    file.write(self.editor.translated_text())
+                self.status_var.set(f"Tradução salva: {file_path}")
+            except Exception as e:
+                messagebox.showerror("Erro", f"Erro ao salvar arquivo: {str(e)}")
+
     def save_as_file(self):
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
@@ -1,11 +1,17 @@
-import os
+import itertools
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter.ttk import Progressbar
-from googletrans import Translator
+from file_scanner import scan_jobs
+from tk_jobs import TkJobRunner
 
 # Função principal para traduzir os arquivos de texto
 def traduzir_arquivos():
+    # O googletrans e o motor de lotes só são carregados quando se traduz
+    from backends import build_router
+    from batch import BatchTranslator, STATUS_ERROR
+    from manifest import TranslationManifest
+
     pasta_entrada = pasta_entrada_var.get()
     pasta_saida = pasta_saida_var.get()
     idioma_origem = "pt"
@@ -15,40 +21,49 @@ def traduzir_arquivos():
         messagebox.showerror("Erro", "Selecione as pastas de entrada e saída!")
         return
 
-    arquivos = [f for f in os.listdir(pasta_entrada) if f.endswith(".txt")]
-    if not arquivos:
+    # Percorre também as subpastas; a saída repete a mesma estrutura
+    trabalhos = scan_jobs(pasta_entrada, pasta_saida, suffix="_traduzido.txt")
+    primeiro = next(trabalhos, None)
+    if primeiro is None:
         messagebox.showinfo("Informação", "Nenhum arquivo .txt encontrado na pasta de entrada.")
         return
+    trabalhos = itertools.chain([primeiro], trabalhos)
 
-    total_arquivos = len(arquivos)
     progresso["value"] = 0
-    janela.update_idletasks()
-
-    tradutor = Translator()
-
-    for i, arquivo in enumerate(arquivos, start=1):
-        caminho_entrada = os.path.join(pasta_entrada, arquivo)
-        try:
-            with open(caminho_entrada, "r", encoding="utf-8") as f:
-                conteudo = f.read()
 
-            # Traduzindo o conteúdo para inglês
-            traducao = tradutor.translate(conteudo, src=idioma_origem, dest=idioma_destino).text
+    # googletrans à frente; se falhar ou ficar lento, o endpoint gtx assume
+    roteador = build_router('googletrans')
 
-            # Salvando o arquivo traduzido na pasta de saída
-            novo_nome = os.path.splitext(arquivo)[0] + "_traduzido.txt"
-            caminho_saida = os.path.join(pasta_saida, novo_nome)
-            with open(caminho_saida, "w", encoding="utf-8") as f:
-                f.write(traducao)
-
-        except Exception as e:
-            messagebox.showwarning("Aviso", f"Erro ao traduzir {arquivo}: {e}")
+    def traduzir_texto(conteudo, progresso_arquivo):
+        # Traduzindo o conteúdo para inglês (consulta primeiro a memória de tradução)
+        return roteador.translate(conteudo, progresso_arquivo, idioma_origem, idioma_destino)
 
+    def atualizar_progresso(arquivo, progresso_arquivo, progresso_total, concluidos, total):
         # Atualizando a barra de progresso
-        progresso["value"] = (i / total_arquivos) * 100
-        janela.update_idletasks()
-
-    messagebox.showinfo("Concluído", "Tradução concluída!")
+        progresso["value"] = progresso_total
+
+    def concluir(resultados):
+        botao_traduzir.config(state="normal")
+        # Um só aviso com as primeiras falhas, em vez de uma janela por arquivo
+        falhas = [resultado for resultado in resultados if resultado.status == STATUS_ERROR]
+        if falhas:
+            detalhes = "\n".join(f"{resultado.name}: {resultado.error}" for resultado in falhas[:10])
+            messagebox.showwarning("Aviso", f"Erro ao traduzir {len(falhas)} arquivo(s):\n{detalhes}")
+
+        messagebox.showinfo("Concluído", "Tradução concluída!")
+
+    def falhar(erro):
+        botao_traduzir.config(state="normal")
+        messagebox.showerror("Erro", f"Erro durante a tradução: {erro}")
+
+    # Salvando cada arquivo traduzido na pasta de saída, vários em paralelo
+    # O lote corre em segundo plano; a janela continua a responder
+    botao_traduzir.config(state="disabled")
+    manifesto = TranslationManifest(pasta_saida, {'source_lang': idioma_origem, 'target_lang': idioma_destino,
+                                                  'engine': 'googletrans'})
+    lote = BatchTranslator(traduzir_texto, manifest=manifesto)
+    trabalhos_tk.submit(lambda progresso_lote: lote.run(trabalhos, progresso_lote),
+                        on_progress=atualizar_progresso, on_done=concluir, on_error=falhar)
 
 # Função para escolher a pasta de entrada
 def escolher_pasta_entrada():
@@ -67,6 +82,7 @@ janela = tk.Tk()
 janela.title("Tradutor de Textos")
 janela.geometry("500x350")
 janela.resizable(False, False)
+trabalhos_tk = TkJobRunner(janela)
 
 # Variáveis para armazenar os caminhos das pastas
 pasta_entrada_var = tk.StringVar()
@@ -0,0 +1,93 @@
+import queue
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    import concurrent.futures
+
+# ~60 atualizações por segundo
+DEFAULT_POLL_MS = 16
+
+
+class TkJobRunner:
+    """
+    Executa trabalhos de tradução fora da thread do Tk.
+
+    O trabalho corre num executor de fundo e recebe uma função ``progress``;
+    o progresso e o resultado são colocados numa fila que o mainloop esvazia
+    com ``after()``. Os callbacks on_progress/on_done/on_error correm sempre
+    na thread do Tk, por isso podem mexer nos widgets diretamente.
+    """
+
+    def __init__(self, root, poll_ms: int = DEFAULT_POLL_MS, workers: int = 2):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._executor = None
+        self._active = 0
+        self._polling = False
+
+    @property
+    def busy(self) -> bool:
+        return self._active > 0
+
+    def submit(self, job: Callable, on_progress: Optional[Callable] = None,
+               on_done: Optional[Callable] = None,
+               on_error: Optional[Callable] = None) -> 'concurrent.futures.Future':
+        """
+        Agenda ``job(progress)`` em segundo plano.
+
+        Args:
+            job: Função executada no executor; chama ``progress(*args)`` para
+                reportar progresso
+            on_progress: Chamada na thread do Tk com os argumentos de progress
+            on_done: Chamada na thread do Tk com o valor devolvido por job
+            on_error: Chamada na thread do Tk com a exceção lançada por job
+        """
+        def progress(*args):
+            if on_progress:
+                self._queue.put((on_progress, args))
+
+        def run():
+            try:
+                result = job(progress)
+            except Exception as e:
+                self._queue.put((self._finish, (on_error, e)))
+                raise
+            self._queue.put((self._finish, (on_done, result)))
+            return result
+
+        if self._executor is None:
+            # Criado no primeiro trabalho, para não atrasar a abertura da janela
+            import concurrent.futures
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.workers,
+                                                                   thread_name_prefix='tk-job')
+        self._active += 1
+        future = self._executor.submit(run)
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def _finish(self, callback, value):
+        self._active -= 1
+        if callback:
+            callback(value)
+
+    def _poll(self):
+        try:
+            while True:
+                try:
+                    callback, args = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                callback(*args)
+        finally:
+            if self._active > 0 or not self._queue.empty():
+                self.root.after(self.poll_ms, self._poll)
+            else:
+                self._polling = False
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,179 @@
+"""
+Tradutor em lote sem interface gráfica, para servidores e cron.
+
+Exemplos:
+    python translate_cli.py -i entrada -o saida -s en -t pt --workers 8
+    cat texto.txt | python translate_cli.py -s pt -t en > traduzido.txt
+    python translate_cli.py -i entrada -o saida --progress-json 2> progresso.jsonl
+    python translate_cli.py -i entrada -o saida -t pt,es,fr
+
+Este módulo não importa tkinter.
+"""
+import argparse
+import json
+import sys
+import time
+
+import metrics
+from backends import BackendRouter, build_router
+from batch import BatchTranslator, DEFAULT_WORKERS, STATUS_ERROR, STATUS_SKIPPED
+from file_scanner import DEFAULT_INCLUDE, scan_jobs
+from google_translator import GoogleTranslator
+from journal import BatchJournal
+from manifest import TranslationManifest
+from prefilter import SegmentFilter
+from rate_limiter import AdaptiveRateLimiter
+from streaming import DEFAULT_STREAM_THRESHOLD, iter_text_windows, translate_windows
+from translation_memory import TranslationMemory
+
+PROGRESS_INTERVAL = 0.5
+
+
+class ProgressReporter:
+    """Escreve eventos JSON (um por linha) no stderr, no máximo a cada PROGRESS_INTERVAL segundos."""
+
+    def __init__(self, stream, enabled: bool):
+        self.stream = stream
+        self.enabled = enabled
+        self._last = 0.0
+        self._done = -1
+
+    def emit(self, event: str, **fields):
+        if not self.enabled:
+            return
+        fields = {'event': event, 'time': round(time.time(), 3), **fields}
+        self.stream.write(json.dumps(fields, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def progress(self, translator: GoogleTranslator, name, file_progress, total_progress, done, total):
+        now = time.monotonic()
+        if done == self._done and now - self._last < PROGRESS_INTERVAL:
+            return
+        self._last = now
+        self._done = done
+        self.emit('progress', file=name, file_progress=round(file_progress, 1),
+                  total_progress=round(total_progress, 1), files_done=done, files_total=total,
+                  rate=round(translator.limiter.rate, 2))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Tradutor de ficheiros de texto sem interface gráfica.")
+    parser.add_argument('-i', '--input-dir', help="pasta de entrada (sem ela lê do stdin)")
+    parser.add_argument('-o', '--output-dir', help="pasta de saída (obrigatória com --input-dir)")
+    parser.add_argument('-s', '--source', default='en', help="idioma de origem (padrão: en)")
+    parser.add_argument('-t', '--target', default='pt',
+                        help="idioma de destino, ou vários separados por vírgulas (padrão: pt)")
+    parser.add_argument('--pattern', action='append',
+                        help="glob dos ficheiros a traduzir, repetível (padrão: *.txt)")
+    parser.add_argument('--exclude', action='append', default=[],
+                        help="glob de ficheiros ou pastas a ignorar, repetível (por exemplo .git)")
+    parser.add_argument('--no-recursive', action='store_true', help="não entra nas subpastas")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f"ficheiros traduzidos em paralelo (padrão: {DEFAULT_WORKERS})")
+    parser.add_argument('--rate', type=float, default=2.0, help="requisições por segundo iniciais")
+    parser.add_argument('--max-rate', type=float, default=20.0, help="limite de requisições por segundo")
+    parser.add_argument('--stream-above', type=int, default=DEFAULT_STREAM_THRESHOLD,
+                        help="ficheiros acima deste tamanho (bytes) são traduzidos em streaming")
+    parser.add_argument('--backend', choices=('gtx', 'googletrans'), default='gtx',
+                        help="motor preferido; o outro, se instalado, é usado quando este falha")
+    parser.add_argument('--dedup', action='store_true',
+                        help="traduz antes, uma só vez, os segmentos repetidos entre ficheiros "
+                             "(percorre a pasta inteira antes da primeira tradução)")
+    parser.add_argument('--no-prefilter', action='store_true',
+                        help="envia também números, datas, URLs, código e linhas já no idioma de destino")
+    parser.add_argument('--memory', help="caminho da memória de tradução SQLite")
+    parser.add_argument('--progress-json', action='store_true',
+                        help="escreve progresso e métricas em JSON lines no stderr")
+    parser.add_argument('--metrics-out',
+                        help="grava as métricas no fim (Prometheus se terminar em .prom/.txt, senão JSON)")
+    return parser
+
+
+def translate_stdin(translator: GoogleTranslator, router: BackendRouter, args, reporter: ProgressReporter) -> int:
+    def translate_text(text, progress):
+        return router.translate(text, progress, args.source, args.target)
+
+    for translated in translate_windows(translate_text, iter_text_windows(sys.stdin), 0):
+        sys.stdout.write(translated)
+        sys.stdout.flush()
+    return 0
+
+
+def translate_folder(translator: GoogleTranslator, router: BackendRouter, args, reporter: ProgressReporter) -> int:
+    # A pasta é percorrida enquanto os primeiros ficheiros já estão a ser traduzidos;
+    # a saída repete a estrutura de subpastas da entrada
+    jobs = scan_jobs(args.input_dir, args.output_dir, args.pattern or DEFAULT_INCLUDE, args.exclude,
+                     recursive=not args.no_recursive)
+    reporter.emit('start', workers=args.workers, targets=args.targets)
+
+    def translate_text(text, progress, checkpoint=None, targets=None):
+        if targets:
+            return router.translate_targets(text, targets, progress, args.source)
+        return router.translate(text, progress, args.source, args.target, checkpoint=checkpoint)
+
+    # Com vários idiomas cada ficheiro é lido uma vez e gera nome.<idioma>.txt;
+    # o idioma passa a fazer parte da chave de cada entrada do manifesto
+    targets = args.targets if len(args.targets) > 1 else None
+    settings = {'source_lang': args.source, 'engine': f'{router.backends[0].name}-linhas'}
+    if not targets:
+        settings['target_lang'] = args.target
+    journal = BatchJournal(args.output_dir, settings)
+    manifest = TranslationManifest(args.output_dir, settings)
+    batch = BatchTranslator(translate_text, workers=args.workers, journal=journal, manifest=manifest,
+                            stream_above=args.stream_above, dedup=args.dedup, targets=targets)
+    try:
+        results = batch.run(jobs, lambda *event: reporter.progress(translator, *event))
+    finally:
+        journal.close()
+
+    for result in results:
+        # Com --progress-json o erro segue no evento 'file'; o stderr fica só com JSON
+        if result.status == STATUS_ERROR and not args.progress_json:
+            print(f"Erro ao traduzir {result.name}: {result.error}", file=sys.stderr)
+        reporter.emit('file', file=result.name, status=result.status, error=result.error,
+                      elapsed=round(result.elapsed, 3))
+
+    failed = sum(1 for result in results if result.status == STATUS_ERROR)
+    reporter.emit('summary', files=len(results),
+                  ok=sum(1 for result in results if result.ok),
+                  skipped=sum(1 for result in results if result.status == STATUS_SKIPPED),
+                  failed=failed, memory=translator.memory.stats(),
+                  connections=translator.session.stats(), rate=round(translator.limiter.rate, 2),
+                  backends=router.describe(), prefilter=SegmentFilter.stats())
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.input_dir and not args.output_dir:
+        parser.error("--output-dir é obrigatório com --input-dir")
+    args.targets = [lang.strip() for lang in args.target.split(',') if lang.strip()]
+    if not args.targets:
+        parser.error("--target vazio")
+    if len(args.targets) > 1 and not args.input_dir:
+        parser.error("vários idiomas de destino só com --input-dir")
+    args.target = args.targets[0]
+
+    memory = TranslationMemory.shared(args.memory) if args.memory else None
+    limiter = AdaptiveRateLimiter(initial_rate=args.rate, max_rate=args.max_rate)
+    translator = GoogleTranslator(memory=memory, limiter=limiter)
+    if args.no_prefilter:
+        translator.prefilter = None
+    router = build_router(args.backend, translator)
+    reporter = ProgressReporter(sys.stderr, args.progress_json)
+
+    started = time.monotonic()
+    if args.input_dir:
+        code = translate_folder(translator, router, args, reporter)
+    else:
+        code = translate_stdin(translator, router, args, reporter)
+    reporter.emit('end', elapsed=round(time.monotonic() - started, 3), exit_code=code,
+                  metrics=metrics.METRICS.snapshot())
+    if args.metrics_out:
+        metrics.METRICS.dump(args.metrics_out)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
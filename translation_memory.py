@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from typing import Optional
+
+DEFAULT_MEMORY_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "translator-pt-en", "translation_memory.sqlite3"
+)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def normalize_segment(text: str) -> str:
+    """Normaliza o segmento antes de calcular a chave (NFC e fins de linha LF)."""
+    return unicodedata.normalize('NFC', text).replace('\r\n', '\n')
+
+
+def segment_key(text: str, source_lang: str, target_lang: str) -> str:
+    payload = f"{source_lang}\0{target_lang}\0{normalize_segment(text)}"
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TranslationMemory:
+    """
+    Memória de tradução persistente em SQLite.
+
+    As entradas são indexadas por (idioma de origem, idioma de destino, hash do
+    segmento normalizado). Quando o tamanho total ultrapassa ``max_bytes`` as
+    entradas menos usadas recentemente são removidas.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = DEFAULT_MEMORY_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Importado aqui para que quem só importa o módulo não pague o sqlite3
+        import sqlite3
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS segments (
+                key TEXT PRIMARY KEY,
+                source_lang TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_segments_last_used ON segments(last_used)")
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM segments").fetchone()[0]
+
+    @classmethod
+    def shared(cls, path: Optional[str] = None) -> 'TranslationMemory':
+        """Devolve uma instância partilhada por caminho (uma ligação por ficheiro)."""
+        path = path or os.environ.get('TRANSLATION_MEMORY_PATH', DEFAULT_MEMORY_PATH)
+        with cls._shared_lock:
+            memory = cls._shared.get(path)
+            if memory is None:
+                memory = cls(path)
+                cls._shared[path] = memory
+            return memory
+
+    def get(self, text: str, source_lang: str, target_lang: str) -> Optional[str]:
+        key = segment_key(text, source_lang, target_lang)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT translation FROM segments WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE segments SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, text: str, source_lang: str, target_lang: str, translation: str):
+        key = segment_key(text, source_lang, target_lang)
+        size = len(text.encode('utf-8')) + len(translation.encode('utf-8'))
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM segments WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO segments VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source_lang, target_lang, translation, size, time.time())
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Remove as entradas mais antigas até ficar abaixo de 90% do limite
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute("SELECT key, size FROM segments ORDER BY last_used").fetchall()
+        removed = []
+        for key, size in rows:
+            if self._total_bytes <= target:
+                break
+            removed.append((key,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM segments WHERE key = ?", removed)
+        self.evictions += len(removed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': self._total_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM segments")
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()